@@ -30,8 +30,8 @@ async def submit_actions(
         accepted = await manager.enqueue_actions(actions=actions_payload)
     except ValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    world = await manager.get_world_state()
+    tick = await manager.current_tick()
     return schemas.EnqueueResponse(
-        accepted=[action.id for action in accepted],
-        tick=world.tick,
+        accepted=accepted,
+        tick=tick,
     )
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+from functools import partial
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.events import reset_stream
+from app.core.http_cache import resource_versions
+from app.core.market_history import market_history
+from app.core.order_book import order_book
+from app.core.player_views import player_views
+from app.core.spatial import entity_grid
 from app.core.ticks import TickManager, verify_replay_range
+from app.core.world_cache import WorldSnapshot, world_cache
 from app.domain import models
-from app.infra.db import get_session
+from app.domain.rules.registry import registry
+from app.domain.services.matching_service import MatchingEngine
+from app.infra.db import get_session, on_commit
+from app.infra.intake_log import get_intake_log
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -28,9 +40,12 @@ async def advance_tick(session: AsyncSession = Depends(get_session)) -> dict:
 @router.post("/world/reset")
 async def reset_world(session: AsyncSession = Depends(get_session)) -> dict:
     ensure_dev_mode()
+    await MatchingEngine(session).release_open_bids()
     for model in [
         models.Event,
         models.Action,
+        # Bids reference the listings they filled, so they go first.
+        models.MarketBid,
         models.MarketListing,
         models.CurrencyPacket,
         models.Entity,
@@ -42,11 +57,34 @@ async def reset_world(session: AsyncSession = Depends(get_session)) -> dict:
         world = models.World(id=1)
         session.add(world)
     else:
+        if get_settings().action_intake == "log":
+            on_commit(session, partial(get_intake_log().discard_through, world.tick))
         world.tick = 0
     await session.flush()
+    snapshot = WorldSnapshot.from_model(world)
+    on_commit(session, lambda: world_cache.push(snapshot))
+    on_commit(session, resource_versions.bump)
+    on_commit(session, market_history.clear)
+    on_commit(session, order_book.reset)
+    on_commit(session, reset_stream)
+    on_commit(session, entity_grid.clear)
+    on_commit(session, player_views.clear)
     return {"tick": world.tick}
 
 
+@router.post("/ruleset")
+async def stage_ruleset(
+    name: str = Query(...),
+    reload: bool = Query(False),
+) -> dict:
+    ensure_dev_mode()
+    try:
+        table = registry.stage(name, reload=reload)
+    except (ImportError, AttributeError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"staged": table.ruleset, "actions": sorted(table.entries)}
+
+
 @router.get("/replay/verify")
 async def replay_verify(
     from_tick: int = Query(0, alias="from"),
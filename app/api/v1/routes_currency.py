@@ -9,8 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import schemas
 from app.core.auth import authenticate_token
 from app.core.config import get_settings
+from app.core.serialization import ORJSONResponse, rows_response
 from app.core.ticks import TickManager
-from app.domain.services.currency_service import CurrencyService
+from app.domain.services.currency_service import PACKET_COLUMNS, CurrencyService
 from app.infra.db import get_session
 
 router = APIRouter(prefix="/currency", tags=["currency"])
@@ -27,7 +28,7 @@ async def balance(
     player=Depends(authenticate_token),
 ) -> schemas.BalanceSchema:
     service = CurrencyService(session)
-    amount = await service.get_balance(player.id)
+    amount = await service.cached_balance(player.id)
     return schemas.BalanceSchema(balance_mamp=amount)
 
 
@@ -39,10 +40,11 @@ async def transfer(
 ) -> schemas.BalanceSchema:
     service = CurrencyService(session)
     try:
-        await service.transfer(player.id, payload.recipient_id, payload.amount_mamp)
+        balance = await service.transfer(
+            player.id, payload.recipient_id, payload.amount_mamp
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    balance = await service.get_balance(player.id)
     return schemas.BalanceSchema(balance_mamp=balance)
 
 
@@ -56,25 +58,29 @@ async def mint_encrypted(
     if not settings.dev_mode:
         raise HTTPException(status_code=403, detail="mint disabled")
     manager = TickManager(session)
-    world = await manager.get_world_state()
+    tick = await manager.current_tick()
     service = CurrencyService(session)
     packet = await service.mint_encrypted_packet(
         owner_id=player.id,
         denom=payload.denom,
         payload=payload.payload,
-        created_tick=world.tick,
+        created_tick=tick,
     )
     return schemas.CurrencyPacketSchema.model_validate(packet)
 
 
-@router.get("/packets", response_model=List[schemas.CurrencyPacketSchema])
+@router.get(
+    "/packets",
+    response_model=List[schemas.CurrencyPacketSchema],
+    response_class=ORJSONResponse,
+)
 async def list_packets(
     session: AsyncSession = Depends(get_session),
     player=Depends(authenticate_token),
-) -> List[schemas.CurrencyPacketSchema]:
+) -> ORJSONResponse:
     service = CurrencyService(session)
-    packets = await service.list_packets(player.id)
-    return [schemas.CurrencyPacketSchema.model_validate(packet) for packet in packets]
+    rows = await service.cached_packet_rows(player.id)
+    return rows_response(PACKET_COLUMNS, rows)
 
 
 @router.post("/decrypt")
@@ -85,8 +91,9 @@ async def decrypt(
 ) -> schemas.BalanceSchema:
     service = CurrencyService(session)
     try:
-        reward = await service.decrypt_packet(player.id, payload.packet_id, payload.solution)
+        _, balance = await service.decrypt_packet(
+            player.id, payload.packet_id, payload.solution
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    balance = await service.get_balance(player.id)
     return schemas.BalanceSchema(balance_mamp=balance)
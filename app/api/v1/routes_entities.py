@@ -1,58 +1,218 @@
 from __future__ import annotations
 
+import math
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import schemas
+from app.core.auth import authenticate_token
+from app.core.serialization import ORJSONResponse, rows_response
+from app.core.spatial import entity_grid, entity_point
+from app.core.ticks import TickManager
 from app.domain import models
+from app.domain.rules.base_ruleset import ValidationError
+from app.domain.services.entity_service import (
+    EntityService,
+    EntityUpdate,
+    entity_etag,
+    parse_etag_version,
+)
 from app.infra.db import get_session
 
 router = APIRouter(prefix="/entities", tags=["entities"])
 
 
-@router.get("/", response_model=List[schemas.EntitySchema])
+ENTITY_COLUMNS = ("id", "type", "owner_id", "pos", "attrs", "version")
+# Ids per IN (...) query for spatial results; stays under SQLite's parameter limit.
+SPATIAL_FETCH_CHUNK = 500
+
+
+@router.get(
+    "/",
+    response_model=List[schemas.EntitySchema],
+    response_class=ORJSONResponse,
+)
 async def list_entities(
     owner_id: Optional[uuid.UUID] = Query(default=None),
     type: Optional[str] = Query(default=None),
+    near: Optional[str] = Query(default=None, description="x,y"),
+    radius: Optional[float] = Query(default=None, ge=0),
+    bbox: Optional[str] = Query(default=None, description="min_x,min_y,max_x,max_y"),
+    limit: Optional[int] = Query(default=None, ge=1),
     session: AsyncSession = Depends(get_session),
-) -> List[schemas.EntitySchema]:
-    stmt = select(models.Entity)
+) -> ORJSONResponse:
+    """Entities, optionally within ``radius`` of ``near`` (nearest first) or ``bbox``.
+
+    Spatial filters are answered from the in-memory grid index. The matching rows
+    are then read from the database in chunks, stopping once ``limit`` rows match.
+    """
+
+    stmt = select(*(getattr(models.Entity, column) for column in ENTITY_COLUMNS))
     if owner_id is not None:
         stmt = stmt.where(models.Entity.owner_id == owner_id)
     if type is not None:
         stmt = stmt.where(models.Entity.type == type)
-    result = await session.execute(stmt)
-    entities = result.scalars().all()
-    return [
-        schemas.EntitySchema(
-            id=entity.id,
-            type=entity.type,
-            owner_id=entity.owner_id,
-            pos=entity.pos,
-            attrs=entity.attrs,
-            version=entity.version,
-        )
-        for entity in entities
-    ]
+    if near is None and bbox is None:
+        result = await session.execute(stmt.limit(limit))
+        return rows_response(ENTITY_COLUMNS, result.tuples())
+
+    if near is not None and bbox is not None:
+        raise HTTPException(status_code=400, detail="Use either near or bbox")
+    if near is not None:
+        if radius is None:
+            raise HTTPException(status_code=400, detail="near requires radius")
+        x, y = _coordinates(near, 2, "near")
+        ids = [entity_id for entity_id, _ in entity_grid.near(x, y, radius)]
+    else:
+        min_x, min_y, max_x, max_y = _coordinates(bbox, 4, "bbox")
+        ids = sorted(entity_grid.within(min_x, min_y, max_x, max_y), key=str)
+    chunk_size = SPATIAL_FETCH_CHUNK
+    if limit is not None and owner_id is None and type is None:
+        # Every indexed id matches, so the first ``limit`` ids normally suffice.
+        chunk_size = min(chunk_size, limit)
+    ordered: List[Tuple] = []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        result = await session.execute(stmt.where(models.Entity.id.in_(chunk)))
+        rows = {row[0]: row for row in result.tuples()}
+        ordered.extend(rows[entity_id] for entity_id in chunk if entity_id in rows)
+        if limit is not None and len(ordered) >= limit:
+            break
+    return rows_response(ENTITY_COLUMNS, ordered[:limit])
+
+
+def _coordinates(value: str, count: int, name: str) -> Tuple[float, ...]:
+    try:
+        numbers = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        numbers = ()
+    if len(numbers) != count or not all(math.isfinite(n) for n in numbers):
+        raise HTTPException(status_code=400, detail=f"{name} needs {count} numbers")
+    return numbers
+
+
+def _entity_schema(entity: models.Entity) -> schemas.EntitySchema:
+    return schemas.EntitySchema(
+        id=entity.id,
+        type=entity.type,
+        owner_id=entity.owner_id,
+        pos=entity.pos,
+        attrs=entity.attrs,
+        version=entity.version,
+    )
+
+
+def _check_pos(pos: Optional[dict]) -> None:
+    if pos is not None and entity_point(pos) is None:
+        raise HTTPException(status_code=400, detail="pos needs numeric x, y")
+
+
+@router.post("/", response_model=schemas.EntitySchema, status_code=201)
+async def create_entity(
+    payload: schemas.EntityCreateRequest,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    player=Depends(authenticate_token),
+) -> schemas.EntitySchema:
+    _check_pos(payload.pos)
+    entity = await EntityService(session).create_entity(
+        type=payload.type, owner_id=player.id, pos=payload.pos, attrs=payload.attrs
+    )
+    response.headers["ETag"] = entity_etag(entity.version)
+    return _entity_schema(entity)
+
+
+@router.post("/updates", response_model=schemas.EnqueueResponse)
+async def submit_updates(
+    payload: schemas.EntityUpdatesRequest,
+    session: AsyncSession = Depends(get_session),
+    player=Depends(authenticate_token),
+) -> schemas.EnqueueResponse:
+    """Queue compare-and-swap updates for the current tick.
+
+    The tick applies them with one statement; each update lands only if the
+    entity is still at ``version``, otherwise an ``entity.conflict`` event names it.
+    """
+
+    manager = TickManager(session)
+    action = {
+        "type": "update_entities",
+        "actor_id": player.id,
+        "payload": {
+            "updates": [
+                update.model_dump(mode="json", exclude_unset=True)
+                for update in payload.updates
+            ]
+        },
+    }
+    try:
+        accepted = await manager.enqueue_actions(actions=[action])
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return schemas.EnqueueResponse(accepted=accepted, tick=await manager.current_tick())
 
 
 @router.get("/{entity_id}", response_model=schemas.EntitySchema)
 async def get_entity(
     entity_id: uuid.UUID,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_session),
 ) -> schemas.EntitySchema:
     entity = await session.get(models.Entity, entity_id)
     if entity is None:
         raise HTTPException(status_code=404, detail="Entity not found")
-    return schemas.EntitySchema(
-        id=entity.id,
-        type=entity.type,
-        owner_id=entity.owner_id,
-        pos=entity.pos,
-        attrs=entity.attrs,
-        version=entity.version,
+    etag = entity_etag(entity.version)
+    if if_match is not None and if_match.strip() != "*":
+        if parse_etag_version(if_match) != entity.version:
+            raise HTTPException(status_code=412, detail="Entity version changed")
+    if if_none_match and parse_etag_version(if_none_match) == entity.version:
+        return Response(status_code=304, headers={"ETag": etag})  # type: ignore
+    response.headers["ETag"] = etag
+    return _entity_schema(entity)
+
+
+@router.patch("/{entity_id}", response_model=schemas.EntitySchema)
+async def update_entity(
+    entity_id: uuid.UUID,
+    payload: schemas.EntityPatchRequest,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
+    session: AsyncSession = Depends(get_session),
+    player=Depends(authenticate_token),
+) -> schemas.EntitySchema:
+    """Compare-and-swap a single entity against the version in ``If-Match``."""
+
+    if if_match is None:
+        raise HTTPException(status_code=428, detail="If-Match required")
+    entity = await session.get(models.Entity, entity_id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    if entity.owner_id != player.id:
+        raise HTTPException(status_code=403, detail="Not entity owner")
+    expected = parse_etag_version(if_match)
+    if if_match.strip() == "*":
+        expected = entity.version
+    if expected is None:
+        raise HTTPException(status_code=412, detail="Entity version changed")
+    changes = payload.model_dump(exclude_unset=True)
+    _check_pos(changes.get("pos"))
+    update = EntityUpdate(
+        entity_id=entity.id,
+        expected_version=expected,
+        actor_id=player.id,
+        pos=changes["pos"] if "pos" in changes else entity.pos,
+        attrs=entity.attrs if changes.get("attrs") is None else changes["attrs"],
+    )
+    applied, _ = await EntityService(session).apply_updates(
+        tick=await TickManager(session).current_tick(), updates=[update]
     )
+    if not applied:
+        raise HTTPException(status_code=412, detail="Entity version changed")
+    response.headers["ETag"] = entity_etag(entity.version)
+    return _entity_schema(entity)
@@ -8,9 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import schemas
 from app.core.auth import authenticate_token
+from app.core.market_history import BAR_COLUMNS, market_history
+from app.core.serialization import ORJSONResponse, rows_response
 from app.core.ticks import TickManager
 from app.domain.models import MarketStatus
-from app.domain.services.market_service import MarketService
+from app.domain.services.market_service import LISTING_COLUMNS, MarketService
 from app.infra.db import get_session
 
 router = APIRouter(prefix="/market", tags=["market"])
@@ -23,32 +25,58 @@ async def create_listing(
     player=Depends(authenticate_token),
 ) -> schemas.MarketListingSchema:
     manager = TickManager(session)
-    world = await manager.get_world_state()
+    tick = await manager.current_tick()
     market = MarketService(session)
     listing = await market.create_listing(
         seller_id=player.id,
         item_type=payload.item_type,
         item_attrs=payload.item_attrs,
         price_amp=payload.price_amp,
-        tick=world.tick,
+        tick=tick,
     )
     return schemas.MarketListingSchema.model_validate(listing)
 
 
-@router.get("/listings", response_model=List[schemas.MarketListingSchema])
+@router.get(
+    "/listings",
+    response_model=List[schemas.MarketListingSchema],
+    response_class=ORJSONResponse,
+)
 async def list_listings(
     status: MarketStatus | None = Query(default=None),
     seller_id: uuid.UUID | None = Query(default=None),
     item_type: str | None = Query(default=None),
     session: AsyncSession = Depends(get_session),
-) -> List[schemas.MarketListingSchema]:
+) -> ORJSONResponse:
     market = MarketService(session)
-    listings = await market.list_listings(
-        status=status,
-        seller_id=seller_id,
-        item_type=item_type,
-    )
-    return [schemas.MarketListingSchema.model_validate(listing) for listing in listings]
+    if seller_id is not None:
+        rows = await market.seller_listing_rows(
+            seller_id, status=status, item_type=item_type
+        )
+    else:
+        rows = await market.listing_rows(status=status, item_type=item_type)
+    return rows_response(LISTING_COLUMNS, rows)
+
+
+@router.get(
+    "/history",
+    response_model=List[schemas.OHLCVBarSchema],
+    response_class=ORJSONResponse,
+)
+async def price_history(
+    item_type: str = Query(...),
+    interval: int = Query(default=1),
+    since_tick: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1),
+) -> ORJSONResponse:
+    try:
+        bars = market_history.bars(item_type, interval, since_tick=since_tick, limit=limit)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=f"interval must be one of {list(market_history.intervals)}",
+        ) from exc
+    return rows_response(BAR_COLUMNS, bars)
 
 
 @router.post("/listings/{listing_id}/buy", response_model=schemas.MarketListingSchema)
@@ -58,13 +86,13 @@ async def buy_listing(
     player=Depends(authenticate_token),
 ) -> schemas.MarketListingSchema:
     manager = TickManager(session)
-    world = await manager.get_world_state()
+    tick = await manager.current_tick()
     market = MarketService(session)
     try:
         listing = await market.buy_listing(
             listing_id=listing_id,
             buyer_id=player.id,
-            tick=world.tick,
+            tick=tick,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -78,13 +106,13 @@ async def cancel_listing(
     player=Depends(authenticate_token),
 ) -> schemas.MarketListingSchema:
     manager = TickManager(session)
-    world = await manager.get_world_state()
+    tick = await manager.current_tick()
     market = MarketService(session)
     try:
         listing = await market.cancel_listing(
             listing_id=listing_id,
             actor_id=player.id,
-            tick=world.tick,
+            tick=tick,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,57 +1,234 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import List
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Set, Union
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import schemas
-from app.infra.db import get_session
+from app.core.events import Cursor, event_cursor, event_message, event_ring
+from app.core.auth import websocket_player_id
+from app.core.metrics import metrics
+from app.core.order_book import MARKET_CHANNEL, order_book
+from app.core.serialization import ORJSONResponse, rows_response
+from app.core.topics import ALL_TOPIC, Subscription, event_index, resolve_topics
+from app.core.wire import (
+    EncodedEvent,
+    QueuedFrame,
+    WireFormat,
+    accept,
+    encode_events,
+    tick_frames,
+)
+from app.infra.db import get_session, lifespan_session
 from app.infra.redis import pubsub
 from app.domain import models
 
 router = APIRouter(tags=["stream"], prefix="")
 
+ws_connections = metrics.gauge("cb_ws_connections", "Open /v1/ws connections.")
+ws_queue_depth = metrics.gauge(
+    "cb_ws_queue_depth", "Events queued across /v1/ws connections, not yet sent."
+)
+ws_send_seconds = metrics.histogram("cb_ws_send_seconds", "Time to send one /v1/ws frame.")
 
-@router.get("/events", response_model=List[schemas.EventSchema])
+
+EVENT_COLUMNS = ("id", "tick", "seq", "kind", "subject_id", "payload")
+REPLAY_PAGE_SIZE = 500
+
+
+def after_cursor(cursor: Cursor):
+    tick, seq = cursor
+    return or_(
+        models.Event.tick > tick, and_(models.Event.tick == tick, models.Event.seq > seq)
+    )
+
+
+@router.get(
+    "/events",
+    response_model=List[schemas.EventSchema],
+    response_class=ORJSONResponse,
+)
 async def list_events(
     since_tick: int = 0,
+    after_seq: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
     session: AsyncSession = Depends(get_session),
-) -> List[schemas.EventSchema]:
-    stmt = (
-        select(models.Event)
-        .where(models.Event.tick >= since_tick)
-        .order_by(models.Event.tick, models.Event.created_at)
-    )
+) -> ORJSONResponse:
+    """Events from ``since_tick`` on, or strictly after ``(since_tick, after_seq)``."""
+
+    stmt = select(*(getattr(models.Event, column) for column in EVENT_COLUMNS))
+    if after_seq is None:
+        stmt = stmt.where(models.Event.tick >= since_tick)
+    else:
+        stmt = stmt.where(after_cursor((since_tick, after_seq)))
+    stmt = stmt.order_by(models.Event.tick, models.Event.seq).limit(limit)
     result = await session.execute(stmt)
-    events = result.scalars().all()
-    return [
-        schemas.EventSchema(
-            id=event.id,
-            tick=event.tick,
-            kind=event.kind,
-            subject_id=event.subject_id,
-            payload=event.payload,
-        )
-        for event in events
-    ]
+    return rows_response(EVENT_COLUMNS, result.tuples())
+
+
+def parse_cursor(value: str) -> Cursor:
+    tick, _, seq = value.partition(":")
+    return int(tick), int(seq or 0)
+
+
+async def replay_events(
+    websocket: WebSocket, wire: WireFormat, subscription: Subscription, cursor: Cursor
+) -> Set[Cursor]:
+    """Send matching events after ``cursor``; returns the cursors it sent.
+
+    Sequence numbers are taken before commit, so an event can commit, and reach
+    the live queue, after one with a higher cursor was replayed. Live delivery
+    therefore skips exactly the replayed cursors rather than everything up to the
+    last one. Only the newest ``event_ring.ticks`` ticks are kept for that check.
+    """
+
+    sent: List[Cursor] = []
+    last = cursor
+
+    async def send(events: List[Dict[str, Any]]) -> None:
+        matched = [
+            EncodedEvent(e) for e in events if event_index.matches(subscription, e)
+        ]
+        for _, group in itertools.groupby(matched, key=lambda e: e.tick):
+            await wire.send(websocket, encode_events(wire, group))
+        sent.extend(event_cursor(e.event) for e in matched)
+
+    if event_ring.covers(cursor):
+        events = event_ring.since(cursor)
+        for start in range(0, len(events), REPLAY_PAGE_SIZE):
+            await send(events[start : start + REPLAY_PAGE_SIZE])
+        if events:
+            last = event_cursor(events[-1])
+    else:
+        # Older than the ring: keyset pages from the table until caught up.
+        while True:
+            async with lifespan_session() as session:
+                stmt = (
+                    select(models.Event)
+                    .where(after_cursor(last))
+                    .order_by(models.Event.tick, models.Event.seq)
+                    .limit(REPLAY_PAGE_SIZE)
+                )
+                rows = (await session.execute(stmt)).scalars().all()
+            events = [event_message(row) for row in rows]
+            if not events:
+                break
+            await send(events)
+            last = event_cursor(events[-1])
+            if len(events) < REPLAY_PAGE_SIZE:
+                break
+    resumed = {"resumed": {"cursor": list(last), "replayed": len(sent)}}
+    await wire.send(websocket, wire.encode(resumed))
+    horizon = last[0] - event_ring.ticks
+    return {sent_cursor for sent_cursor in sent if sent_cursor[0] >= horizon}
 
 
 @router.websocket("/ws")
 async def websocket_stream(websocket: WebSocket) -> None:
-    await websocket.accept()
-    queue: asyncio.Queue[dict] = asyncio.Queue()
+    """Event stream filtered by topics.
+
+    Topics come from ``?topics=`` (comma separated; everything by default) and can
+    be changed with ``{"op": "subscribe" | "unsubscribe", "topics": [...]}``.
+    ``?since=<tick>:<seq>`` first replays missed events after that cursor, then
+    switches to live delivery. Live events the replay already sent are skipped,
+    while ones that committed late with a lower cursor are still delivered, so
+    nothing is lost or sent twice. Frames are JSON unless
+    the ``cb.msgpack`` subprotocol is negotiated; events queued for the same tick
+    go out as one frame.
+    """
+
+    wire = await accept(websocket)
+    player_id = await websocket_player_id(websocket)
+    queue: asyncio.Queue[Optional[QueuedFrame]] = asyncio.Queue()
 
-    def callback(message: dict) -> None:
-        queue.put_nowait(message)
+    def push(data: Union[EncodedEvent, bytes], cursor: Optional[Cursor] = None) -> None:
+        queue.put_nowait((data, cursor))
+        ws_queue_depth.inc()
 
-    pubsub.subscribe("events", callback)
+    async def read_commands() -> None:
+        try:
+            while True:
+                try:
+                    command = await wire.receive(websocket)
+                    op = command.get("op")
+                    if op not in ("subscribe", "unsubscribe"):
+                        raise ValueError(f"unknown op {op!r}")
+                    topics = resolve_topics(command.get("topics", []), player_id)
+                except (ValueError, AttributeError) as exc:
+                    push(wire.encode({"error": str(exc)}))
+                    continue
+                if op == "subscribe":
+                    event_index.add(subscription, topics)
+                else:
+                    event_index.remove(subscription, topics)
+                push(wire.encode({"topics": sorted(subscription.topics)}))
+        except WebSocketDisconnect:
+            queue.put_nowait(None)
+            ws_queue_depth.inc()
+
+    try:
+        initial = resolve_topics(
+            (websocket.query_params.get("topics") or ALL_TOPIC).split(","), player_id
+        )
+        since = websocket.query_params.get("since")
+        cursor = parse_cursor(since) if since else None
+    except ValueError as exc:
+        await websocket.close(code=1008, reason=str(exc))
+        return
+
+    subscription = event_index.open(push)
+    event_index.add(subscription, initial)
+    ws_connections.inc()
+    reader = asyncio.create_task(read_commands())
+    try:
+        # Live events keep queueing during the replay; anything it sent is skipped.
+        replayed = (
+            await replay_events(websocket, wire, subscription, cursor)
+            if cursor
+            else None
+        )
+        while True:
+            items = [await queue.get()]
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            ws_queue_depth.dec(len(items))
+            closed = None in items
+            if closed:
+                items = items[: items.index(None)]
+            for frame in tick_frames(wire, items, replayed):
+                started = time.perf_counter()
+                await wire.send(websocket, frame)
+                ws_send_seconds.observe(time.perf_counter() - started)
+            if closed:
+                return
+    except WebSocketDisconnect:
+        return
+    finally:
+        reader.cancel()
+        event_index.close(subscription)
+        ws_connections.dec()
+        ws_queue_depth.dec(queue.qsize())
+
+
+@router.websocket("/ws/market")
+async def market_stream(websocket: WebSocket) -> None:
+    """Order book snapshot on connect, then one pre-encoded delta frame per tick."""
+
+    await websocket.accept()
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    # Subscribe and snapshot without yielding, so the first delta follows the snapshot.
+    pubsub.subscribe(MARKET_CHANNEL, queue.put_nowait)
+    snapshot = order_book.snapshot()
     try:
+        await websocket.send_text(snapshot)
         while True:
-            message = await queue.get()
-            await websocket.send_text(json.dumps({"events": [message]}))
+            await websocket.send_text(await queue.get())
     except WebSocketDisconnect:
         return
+    finally:
+        pubsub.unsubscribe(MARKET_CHANNEL, queue.put_nowait)
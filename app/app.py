@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import uuid
 from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import (
@@ -16,19 +19,66 @@ from app.api.v1 import (
     routes_world,
 )
 from app.core.config import get_settings
-from app.core.logging import bind_request_context, clear_request_context, configure_logging
-from app.infra.db import init_db
+from app.core.events import event_ring
+from app.core.http_cache import ResponseCache
+from app.core.logging import (
+    bind_request_context,
+    clear_request_context,
+    configure_logging,
+    get_logger,
+    should_log_request,
+)
+from app.core.metrics import FileBackedMetrics, metrics
+from app.core.player_views import player_views
+from app.core.spatial import entity_grid
+from app.core.ticks import TickManager
+from app.domain.rules.registry import registry
+from app.domain.services.entity_service import EntityService
+from app.domain.services.market_service import MarketService
+from app.infra.db import init_db, lifespan_session
+from app.mcp import server as mcp_server
+
+
+http_requests_total = metrics.counter(
+    "cb_http_requests_total", "HTTP requests handled.", ["method", "route", "status"]
+)
+http_request_seconds = metrics.histogram(
+    "cb_http_request_seconds", "HTTP request latency.", ["method", "route"]
+)
+request_logger = get_logger("app.requests")
 
-# Import ruleset to register actions
-from app.domain.rules import season1_dark_grid  # noqa: F401
+
+async def _publish_metrics(shared: FileBackedMetrics, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        shared.write(metrics)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
     configure_logging(debug=settings.debug)
+    registry.activate(settings.ruleset)
+    event_ring.ticks = settings.stream_replay_ticks
+    entity_grid.cell_size = settings.entity_grid_cell_size
+    player_views.max_players = settings.player_view_cache_size
     await init_db()
-    yield
+    async with lifespan_session() as session:
+        market = MarketService(session)
+        await market.load_history()
+        await market.load_book((await TickManager(session).get_world_state()).tick)
+        await EntityService(session).load_index()
+    publisher = None
+    if settings.metrics_dir:
+        shared = FileBackedMetrics(settings.metrics_dir, settings.metrics_stale_seconds)
+        publisher = asyncio.create_task(
+            _publish_metrics(shared, settings.metrics_stale_seconds / 3)
+        )
+    try:
+        yield
+    finally:
+        if publisher is not None:
+            publisher.cancel()
 
 
 def create_app() -> FastAPI:
@@ -43,15 +93,43 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    response_cache = ResponseCache(max_entries=settings.response_cache_size)
+
+    @app.middleware("http")
+    async def response_cache_middleware(request: Request, call_next):  # type: ignore[override]
+        return await response_cache(request, call_next)
+
     @app.middleware("http")
     async def request_context_middleware(request: Request, call_next):  # type: ignore[override]
         request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
         bind_request_context(request_id=request_id)
+        started = time.perf_counter()
+        status_code = 500
         try:
             response = await call_next(request)
+            status_code = response.status_code
             response.headers["X-Request-ID"] = request_id
+            response.headers["Server-Timing"] = (
+                f"app;dur={(time.perf_counter() - started) * 1000:.3f}"
+            )
             return response
         finally:
+            # Label by route template, not raw path, to keep cardinality bounded.
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            elapsed = time.perf_counter() - started
+            http_request_seconds.observe(elapsed, method=request.method, route=path)
+            http_requests_total.inc(
+                method=request.method, route=path, status=str(status_code)
+            )
+            if should_log_request(settings.request_log_sample_rate, status_code):
+                request_logger.info(
+                    "request.completed",
+                    method=request.method,
+                    route=path,
+                    status=status_code,
+                    duration_ms=round(elapsed * 1000, 3),
+                )
             clear_request_context()
 
     api_v1 = APIRouter(prefix="/v1")
@@ -64,6 +142,8 @@ def create_app() -> FastAPI:
     api_v1.include_router(routes_stream.router)
 
     app.include_router(api_v1)
+    # The MCP socket shares the API process, so its subscriptions see live events.
+    app.add_api_websocket_route("/mcp", mcp_server.websocket_endpoint)
 
     @app.get("/healthz")
     async def health() -> dict:
@@ -73,4 +153,13 @@ def create_app() -> FastAPI:
     async def ready() -> dict:
         return {"status": "ready"}
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics() -> PlainTextResponse:
+        if settings.metrics_dir:
+            shared = FileBackedMetrics(settings.metrics_dir, settings.metrics_stale_seconds)
+            body = shared.render(metrics)
+        else:
+            body = metrics.render()
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
     return app
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.core.ticks import TickManager
+from app.infra.db import lifespan_session
+
+Submission = List[Dict[str, object]]
+Accepted = Tuple[int, List[uuid.UUID]]  # (tick, action ids)
+Pending = Tuple[Submission, "asyncio.Future[Accepted]"]
+
+
+class ActionBatcher:
+    """Coalesces action submissions from many callers into bulk enqueues.
+
+    Submissions made within ``interval`` seconds of the first one in a window
+    share one session, one insert and one commit. Each still gets its own
+    result: ``submit`` returns ``(tick, action ids)`` or raises the
+    ``ValidationError`` that rejected that submission alone.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._pending: List[Pending] = []
+        self._flushes: Set[asyncio.Task[None]] = set()
+
+    async def submit(self, actions: Iterable[Dict[str, object]]) -> Accepted:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Accepted] = loop.create_future()
+        self._pending.append((list(actions), future))
+        if len(self._pending) == 1:
+            loop.call_later(self.interval, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(pending))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, pending: List[Pending]) -> None:
+        try:
+            async with lifespan_session() as session:
+                manager = TickManager(session)
+                tick = await manager.current_tick()
+                results = await manager.action_service.enqueue_batch(
+                    tick=tick, submissions=[actions for actions, _ in pending]
+                )
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(pending, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result((tick, result))
+
+
+_action_batcher: Optional[ActionBatcher] = None
+
+
+def get_action_batcher() -> ActionBatcher:
+    global _action_batcher
+    if _action_batcher is None:
+        _action_batcher = ActionBatcher(get_settings().action_batch_interval_ms / 1000)
+    return _action_batcher
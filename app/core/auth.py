@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 import hashlib
+import uuid
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, WebSocket, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain import models
-from app.infra.db import get_session
+from app.infra.db import get_session, lifespan_session
 
 security = HTTPBearer(auto_error=False)
 
@@ -18,6 +19,29 @@ async def hash_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
+async def player_for_token(
+    session: AsyncSession, token: str
+) -> Optional[models.Player]:
+    token_hash = await hash_token(token)
+    stmt = select(models.Player).where(models.Player.token_hash == token_hash)
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+
+async def websocket_player_id(websocket: WebSocket) -> Optional[uuid.UUID]:
+    """Player named by a WebSocket's ``?token=`` or bearer header, if any."""
+
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        return None
+    async with lifespan_session() as session:
+        player = await player_for_token(session, token)
+    return player.id if player is not None else None
+
+
 async def authenticate_token(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     session: AsyncSession = Depends(get_session),
@@ -25,10 +49,7 @@ async def authenticate_token(
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    token_hash = await hash_token(credentials.credentials)
-    stmt = select(models.Player).where(models.Player.token_hash == token_hash)
-    result = await session.execute(stmt)
-    player: Optional[models.Player] = result.scalars().first()
+    player = await player_for_token(session, credentials.credentials)
     if player is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     return player
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseSettings, Field
 
@@ -21,7 +21,17 @@ class Settings(BaseSettings):
     redis_url: str = Field("redis://localhost:6379/0", alias="REDIS_URL")
     tick_interval_seconds: float = Field(1.0, alias="TICK_INTERVAL_SECONDS")
     ruleset: str = Field("season1_dark_grid", alias="RULESET")
+    response_cache_size: int = Field(1024, alias="RESPONSE_CACHE_SIZE")
+    action_intake: Literal["db", "log"] = Field("db", alias="ACTION_INTAKE")
+    intake_log_dir: str = Field("./intake", alias="INTAKE_LOG_DIR")
+    intake_fsync_interval_ms: float = Field(2.0, alias="INTAKE_FSYNC_INTERVAL_MS")
+    action_batch_interval_ms: float = Field(2.0, alias="ACTION_BATCH_INTERVAL_MS")
+    metrics_dir: Optional[str] = Field(None, alias="METRICS_DIR")
+    metrics_stale_seconds: float = Field(30.0, alias="METRICS_STALE_SECONDS")
     request_log_sample_rate: float = Field(1.0, alias="REQUEST_LOG_SAMPLE_RATE")
+    stream_replay_ticks: int = Field(100, alias="STREAM_REPLAY_TICKS")
+    entity_grid_cell_size: float = Field(16.0, alias="ENTITY_GRID_CELL_SIZE")
+    player_view_cache_size: int = Field(10_000, alias="PLAYER_VIEW_CACHE_SIZE")
     dev_mode: bool = Field(True, alias="DEV_MODE")
 
     class Config:
@@ -1,13 +1,109 @@
 from __future__ import annotations
 
 import uuid
-from typing import Any, Dict, Iterable, List
+from collections import deque
+from functools import partial
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain import models
+from app.infra.db import on_commit
 from app.infra.redis import pubsub
 
+Cursor = Tuple[int, int]  # (tick, seq)
+
+
+class EventSequencer:
+    """Hands out per-tick event sequence numbers, continuing from the stored maximum."""
+
+    keep_ticks = 8
+
+    def __init__(self) -> None:
+        self._last: Dict[int, int] = {}
+
+    async def next(self, session: AsyncSession, tick: int) -> int:
+        if tick not in self._last:
+            stored = await session.scalar(
+                select(func.max(models.Event.seq)).where(models.Event.tick == tick)
+            )
+            self._last.setdefault(tick, int(stored or 0))
+            for stale in sorted(self._last)[: -self.keep_ticks]:
+                del self._last[stale]
+        self._last[tick] += 1
+        return self._last[tick]
+
+    def reset(self) -> None:
+        self._last.clear()
+
+
+class EventRing:
+    """Committed events for the most recent ticks, in publish order.
+
+    ``complete_from`` is the first tick whose events are all held here; resumes
+    from before it have to read the event table.
+    """
+
+    def __init__(self, ticks: int = 100) -> None:
+        self.ticks = ticks
+        self._events: Deque[Dict[str, Any]] = deque()
+        self.complete_from: Optional[int] = None
+
+    def append(self, event: Dict[str, Any]) -> None:
+        tick = int(event["tick"])
+        if self.complete_from is None:
+            # Earlier events of this tick may predate the process.
+            self.complete_from = tick + 1
+        self._events.append(event)
+        horizon = tick - self.ticks
+        while self._events and self._events[0]["tick"] <= horizon:
+            self._events.popleft()
+            self.complete_from = max(self.complete_from, horizon + 1)
+
+    def covers(self, cursor: Cursor) -> bool:
+        return self.complete_from is not None and cursor[0] >= self.complete_from
+
+    def since(self, cursor: Cursor) -> List[Dict[str, Any]]:
+        return sorted(
+            (event for event in self._events if event_cursor(event) > cursor),
+            key=event_cursor,
+        )
+
+    def clear(self, complete_from: Optional[int] = None) -> None:
+        self._events.clear()
+        self.complete_from = complete_from
+
+
+def event_cursor(event: Dict[str, Any]) -> Cursor:
+    return int(event.get("tick", 0)), int(event.get("seq", 0))
+
+
+event_sequencer = EventSequencer()
+event_ring = EventRing()
+
+
+def event_message(event: models.Event) -> Dict[str, Any]:
+    return {
+        "id": str(event.id),
+        "tick": event.tick,
+        "seq": event.seq,
+        "kind": event.kind,
+        "subject_id": str(event.subject_id) if event.subject_id else None,
+        "payload": event.payload,
+    }
+
+
+def _publish(message: Dict[str, Any]) -> None:
+    event_ring.append(message)
+    pubsub.publish("events", message)
+
+
+def reset_stream() -> None:
+    event_sequencer.reset()
+    # The event table was emptied too, so the ring holds everything from here on.
+    event_ring.clear(complete_from=0)
+
 
 async def record_event(
     session: AsyncSession,
@@ -19,22 +115,15 @@ async def record_event(
 ) -> models.Event:
     event = models.Event(
         tick=tick,
+        seq=await event_sequencer.next(session, tick),
         kind=kind,
         subject_id=subject_id,
         payload=payload,
     )
     session.add(event)
     await session.flush()
-    pubsub.publish(
-        "events",
-        {
-            "id": str(event.id),
-            "tick": event.tick,
-            "kind": event.kind,
-            "subject_id": str(event.subject_id) if event.subject_id else None,
-            "payload": event.payload,
-        },
-    )
+    # Subscribers only see committed events, so a resume never replays a rolled back one.
+    on_commit(session, partial(_publish, event_message(event)))
     return event
 
 
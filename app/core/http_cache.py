@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.world_cache import world_cache
+
+# Path prefix -> resource whose version participates in the ETag.
+CACHEABLE_RESOURCES: Tuple[Tuple[str, str], ...] = (
+    ("/v1/world", "world"),
+    ("/v1/market/listings", "market"),
+    ("/v1/market/history", "market"),
+    ("/v1/entities", "entities"),
+)
+
+# Item routes that answer conditional requests with their own per-row ETags.
+ROW_VERSIONED_PREFIXES: Tuple[str, ...] = ("/v1/entities/",)
+
+
+class ResourceVersions:
+    """Per-resource write counters; bumped after the writing transaction commits."""
+
+    def __init__(self) -> None:
+        self._versions: Dict[str, int] = {}
+
+    def get(self, resource: str) -> int:
+        return self._versions.get(resource, 0)
+
+    def bump(self, *resources: str) -> None:
+        for resource in resources or ("*",):
+            self._versions[resource] = self._versions.get(resource, 0) + 1
+
+
+resource_versions = ResourceVersions()
+
+
+def resource_for_path(path: str) -> Optional[str]:
+    for prefix in ROW_VERSIONED_PREFIXES:
+        if path.startswith(prefix) and len(path) > len(prefix):
+            return None
+    for prefix, resource in CACHEABLE_RESOURCES:
+        if path.startswith(prefix):
+            return resource
+    return None
+
+
+def current_etag(resource: str) -> Optional[str]:
+    snapshot = world_cache.get()
+    if snapshot is None:
+        return None
+    version = resource_versions.get(resource) + resource_versions.get("*")
+    return f'"t{snapshot.tick}-v{version}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[str, str], Tuple[str, bytes, str]] = OrderedDict()
+
+    def lookup(self, key: Tuple[str, str], etag: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def store(self, key: Tuple[str, str], etag: str, body: bytes, media_type: str) -> None:
+        self._entries[key] = (etag, body, media_type)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def __call__(self, request: Request, call_next) -> Response:
+        resource = resource_for_path(request.url.path)
+        if request.method != "GET" or resource is None:
+            return await call_next(request)
+        etag = current_etag(resource)
+        if etag is None:
+            return await call_next(request)
+
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        key = (request.url.path, request.url.query)
+        cached = self.lookup(key, etag)
+        if cached is not None:
+            body, media_type = cached
+            return Response(content=body, media_type=media_type, headers={"ETag": etag})
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = dict(response.headers)
+        headers.pop("content-length", None)
+        # A write that committed while we rendered makes this body unsafe to reuse.
+        if current_etag(resource) == etag:
+            self.store(key, etag, body, headers.get("content-type", "application/json"))
+            headers["etag"] = etag
+        return Response(content=body, status_code=response.status_code, headers=headers)
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
+import random
 import sys
-from typing import Any, Dict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional
 
+import orjson
 import structlog
 
+_listener: Optional[QueueListener] = None
+
+
+def _orjson_dumps(value: Any, default: Optional[Callable[[Any], Any]] = None, **_: Any) -> str:
+    return orjson.dumps(value, default=default).decode("utf-8")
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def configure_logging(debug: bool = False) -> None:
-    """Configure structured logging for the service."""
+    """Configure structured logging for the service.
+
+    Records are rendered with orjson and handed to a background thread through a
+    queue, so the event loop never blocks on stdout.
+    """
 
+    global _listener
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
     structlog.configure(
@@ -19,18 +42,33 @@ def configure_logging(debug: bool = False) -> None:
             timestamper,
             structlog.processors.EventRenamer("message"),
             structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
         ],
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
 
-    logging.basicConfig(
-        level=logging.DEBUG if debug else logging.INFO,
-        format="%(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
+    _stop_listener()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+
+
+atexit.register(_stop_listener)
+
+
+def should_log_request(sample_rate: float, status_code: int) -> bool:
+    # Server errors are always kept; everything else is sampled.
+    if status_code >= 500 or sample_rate >= 1.0:
+        return True
+    return sample_rate > 0.0 and random.random() < sample_rate  # noqa: S311
 
 
 def bind_request_context(**kwargs: Any) -> None:
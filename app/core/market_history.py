@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bar widths in ticks; every trade feeds all of them.
+INTERVALS: Tuple[int, ...] = (1, 10, 100)
+DEFAULT_CAPACITY = 512
+
+BAR_COLUMNS = ("start_tick", "open", "high", "low", "close", "volume", "notional")
+
+Trade = Tuple[str, int, int]  # (item_type, tick, price_amp)
+
+
+class BarSeries:
+    """Fixed-size ring of OHLCV bars for one item type and interval.
+
+    Slot ``bucket % capacity`` holds the bar starting at ``bucket * interval``; a
+    slot whose start tick is stale is simply overwritten, so old bars age out
+    without any bookkeeping.
+    """
+
+    __slots__ = (
+        "interval",
+        "capacity",
+        "start",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "notional",
+    )
+
+    def __init__(self, interval: int, capacity: int) -> None:
+        self.interval = interval
+        self.capacity = capacity
+        self.start = array("q", [-1]) * capacity
+        self.open = array("q", [0]) * capacity
+        self.high = array("q", [0]) * capacity
+        self.low = array("q", [0]) * capacity
+        self.close = array("q", [0]) * capacity
+        self.volume = array("q", [0]) * capacity
+        self.notional = array("q", [0]) * capacity
+
+    def add(self, tick: int, price: int) -> None:
+        start = tick - tick % self.interval
+        slot = (tick // self.interval) % self.capacity
+        if self.start[slot] != start:
+            self.start[slot] = start
+            self.open[slot] = self.high[slot] = self.low[slot] = price
+            self.volume[slot] = self.notional[slot] = 0
+        elif price > self.high[slot]:
+            self.high[slot] = price
+        elif price < self.low[slot]:
+            self.low[slot] = price
+        self.close[slot] = price
+        self.volume[slot] += 1
+        self.notional[slot] += price
+
+    def rows(self, since_tick: int, limit: int) -> List[Tuple[int, ...]]:
+        slots = sorted(
+            (self.start[slot], slot)
+            for slot in range(self.capacity)
+            if self.start[slot] >= 0 and self.start[slot] + self.interval > since_tick
+        )
+        return [
+            (
+                start,
+                self.open[slot],
+                self.high[slot],
+                self.low[slot],
+                self.close[slot],
+                self.volume[slot],
+                self.notional[slot],
+            )
+            for start, slot in slots[-limit:]
+        ]
+
+
+class MarketHistory:
+    """Per-item-type OHLCV bars, fed with each committed tick's trades."""
+
+    def __init__(
+        self, intervals: Iterable[int] = INTERVALS, capacity: int = DEFAULT_CAPACITY
+    ) -> None:
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self._series: Dict[str, Dict[int, BarSeries]] = {}
+
+    def ingest(self, trades: Iterable[Trade]) -> None:
+        for item_type, tick, price in trades:
+            series = self._series.get(item_type)
+            if series is None:
+                series = self._series[item_type] = {
+                    interval: BarSeries(interval, self.capacity)
+                    for interval in self.intervals
+                }
+            for bars in series.values():
+                bars.add(tick, price)
+
+    def bars(
+        self,
+        item_type: str,
+        interval: int,
+        *,
+        since_tick: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, ...]]:
+        if interval not in self.intervals:
+            raise KeyError(interval)
+        series = self._series.get(item_type)
+        if series is None:
+            return []
+        return series[interval].rows(since_tick, limit or self.capacity)
+
+    def item_types(self) -> List[str]:
+        return sorted(self._series)
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+market_history = MarketHistory()
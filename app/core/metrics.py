@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(names, values, strict=True)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(key), value] for key, value in self.values.items()],
+        }
+
+    def merge(self, values: Iterable[Any]) -> None:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+    def merge(self, values: Iterable[Any]) -> None:
+        for key, value in values:
+            self.values[tuple(key)] = self.values.get(tuple(key), 0.0) + value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: ([bucket counts..., +Inf count], [sum]).
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = state
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = super().snapshot()
+        state["buckets"] = list(self.buckets)
+        return state
+
+    def merge(self, values: Iterable[Any]) -> None:
+        for key, (counts, total) in values:
+            state = self.values.get(tuple(key))
+            if state is None:
+                self.values[tuple(key)] = (list(counts), list(total))
+                continue
+            for index, count in enumerate(counts):
+                state[0][index] += count
+            state[1][0] += total[0]
+
+    def samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metric registry rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        for name, state in snapshot.items():
+            kind = state["kind"]
+            if kind == "histogram":
+                metric: Metric = self.histogram(
+                    name, state["help"], state["labelnames"], state["buckets"]
+                )
+            elif kind == "gauge":
+                metric = self.gauge(name, state["help"], state["labelnames"])
+            else:
+                metric = self.counter(name, state["help"], state["labelnames"])
+            metric.merge(state["values"])
+
+
+class FileBackedMetrics:
+    """Aggregates per-worker registries through snapshot files in a shared directory.
+
+    Each worker only ever writes its own ``metrics-<pid>.json`` (atomically), so no
+    cross-process locking is needed. Files older than ``stale_after`` seconds are
+    treated as belonging to dead workers and ignored.
+    """
+
+    def __init__(self, directory: str, stale_after: float) -> None:
+        self.directory = Path(directory)
+        self.stale_after = stale_after
+
+    def _path(self) -> Path:
+        return self.directory / f"metrics-{os.getpid()}.json"
+
+    def write(self, registry: MetricsRegistry) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(registry.snapshot()))
+        os.replace(tmp, path)
+
+    def render(self, registry: MetricsRegistry) -> str:
+        self.write(registry)
+        aggregate = MetricsRegistry()
+        cutoff = time.time() - self.stale_after
+        for path in self.directory.glob("metrics-*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    continue
+                aggregate.merge(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return aggregate.render()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+
+from app.infra.redis import pubsub
+
+MARKET_CHANNEL = "market"
+
+# (kind, item_type, listing_id, price_amp); kind is "added", "filled" or "cancelled".
+BookChange = Tuple[str, str, str, int]
+
+
+class OrderBook:
+    """Open listings per item type, published as a snapshot plus per-tick deltas.
+
+    Committed changes are staged as they happen and folded into the book when a
+    tick commits. Each flush gets the next sequence number, so a subscriber that
+    starts from ``snapshot()`` can apply deltas in order and detect gaps.
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[str, Dict[str, int]] = {}
+        self._staged: List[BookChange] = []
+        self.seq = 0
+        self.tick = 0
+
+    def load(self, listings: Iterable[Tuple[str, str, int]], tick: int) -> None:
+        self._books = {}
+        self._staged = []
+        for item_type, listing_id, price in listings:
+            self._books.setdefault(item_type, {})[listing_id] = price
+        self.tick = tick
+        self._publish_snapshot()
+
+    def stage(self, changes: Iterable[BookChange]) -> None:
+        self._staged.extend(changes)
+
+    def flush(self, tick: int) -> None:
+        self.tick = tick
+        if not self._staged:
+            return
+        staged, self._staged = self._staged, []
+        deltas: Dict[str, Dict[str, List[Tuple[str, int]]]] = {}
+        for kind, item_type, listing_id, price in staged:
+            book = self._books.setdefault(item_type, {})
+            if kind == "added":
+                book[listing_id] = price
+            else:
+                book.pop(listing_id, None)
+            changes = deltas.setdefault(
+                item_type, {"added": [], "filled": [], "cancelled": []}
+            )
+            changes[kind].append((listing_id, price))
+        self.seq += 1
+        pubsub.publish(
+            MARKET_CHANNEL,
+            orjson.dumps(
+                {"type": "book.delta", "seq": self.seq, "tick": tick, "books": deltas}
+            ).decode("utf-8"),
+        )
+
+    def books(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Open listings per item type, cheapest first."""
+
+        return {
+            item_type: sorted(
+                ((listing_id, price) for listing_id, price in book.items()),
+                key=lambda entry: (entry[1], entry[0]),
+            )
+            for item_type, book in sorted(self._books.items())
+            if book
+        }
+
+    def snapshot(self) -> str:
+        return orjson.dumps(
+            {
+                "type": "book.snapshot",
+                "seq": self.seq,
+                "tick": self.tick,
+                "books": self.books(),
+            }
+        ).decode("utf-8")
+
+    def reset(self) -> None:
+        self.load((), 0)
+
+    def _publish_snapshot(self) -> None:
+        # Subscribers resynchronise from a snapshot after a reload or reset.
+        self.seq += 1
+        pubsub.publish(MARKET_CHANNEL, self.snapshot())
+
+
+order_book = OrderBook()
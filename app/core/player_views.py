@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infra.db import on_commit, on_rollback
+
+Row = Tuple[Any, ...]
+
+DEFAULT_MAX_PLAYERS = 10_000
+
+
+@dataclass(slots=True)
+class PlayerView:
+    balance: Optional[int] = None
+    packets: Optional[List[Row]] = None
+    # Every listing the player sells, ordered by ``created_tick``.
+    listings: Optional[List[Row]] = None
+
+
+class PlayerViews:
+    """Per-player derived state, so dashboard reads can skip the database.
+
+    Writers register the players they touch while their transaction is open
+    (``record_balance`` / ``record_player_changes``); on commit the balance they
+    computed is stored and the other touched views are dropped. If two
+    transactions write the same player at once, neither stores its value,
+    because the commit callbacks might run in a different order than the
+    commits themselves. Reads fill missing views from the database, tagged with
+    ``stamp()`` from before the query. The fill is dropped if that player was
+    written in the meantime.
+    """
+
+    def __init__(self, max_players: int = DEFAULT_MAX_PLAYERS) -> None:
+        self.max_players = max_players
+        self._views: OrderedDict[uuid.UUID, PlayerView] = OrderedDict()
+        self._clock = 0
+        self._cleared_at = 0
+        self._changed: Dict[uuid.UUID, int] = {}
+        self._writers: Dict[uuid.UUID, int] = {}
+        self._contended: Set[uuid.UUID] = set()
+
+    def stamp(self) -> int:
+        return self._clock
+
+    def get(self, player_id: uuid.UUID) -> Optional[PlayerView]:
+        view = self._views.get(player_id)
+        if view is not None:
+            self._views.move_to_end(player_id)
+        return view
+
+    def _settled(self, player_id: uuid.UUID, stamp: int) -> bool:
+        changed = self._changed.get(player_id, self._cleared_at)
+        return not self._writers.get(player_id) and changed <= stamp
+
+    def _view(self, player_id: uuid.UUID) -> PlayerView:
+        view = self._views.get(player_id)
+        if view is None:
+            view = self._views[player_id] = PlayerView()
+            while len(self._views) > self.max_players:
+                self._views.popitem(last=False)
+        self._views.move_to_end(player_id)
+        return view
+
+    def fill(self, player_id: uuid.UUID, stamp: int, view: str, value: Any) -> None:
+        if self._settled(player_id, stamp):
+            setattr(self._view(player_id), view, value)
+
+    def push_balances(
+        self, balances: Iterable[Tuple[uuid.UUID, int]], stamp: int
+    ) -> None:
+        """Balances read by a committed tick; only players already tracked or
+        fitting in spare capacity are stored, so a tick never evicts views."""
+
+        for player_id, balance in balances:
+            if not self._settled(player_id, stamp):
+                continue
+            view = self._views.get(player_id)
+            if view is None:
+                if len(self._views) >= self.max_players:
+                    continue
+                view = self._views[player_id] = PlayerView()
+            view.balance = balance
+
+    def begin_write(self, player_id: uuid.UUID) -> None:
+        self._clock += 1
+        self._changed[player_id] = self._clock
+        self._writers[player_id] = self._writers.get(player_id, 0) + 1
+        if self._writers[player_id] > 1:
+            self._contended.add(player_id)
+
+    def finish_write(
+        self, changes: Dict[uuid.UUID, Dict[str, Any]], committed: bool
+    ) -> None:
+        for player_id, views in changes.items():
+            self._clock += 1
+            self._changed[player_id] = self._clock
+            contended = player_id in self._contended
+            remaining = self._writers.pop(player_id, 1) - 1
+            if remaining > 0:
+                self._writers[player_id] = remaining
+            else:
+                self._contended.discard(player_id)
+            view = self._views.get(player_id)
+            if not committed or view is None:
+                continue
+            if contended:
+                views = dict.fromkeys(views)
+            for name, value in views.items():
+                setattr(view, name, value)
+
+    def clear(self) -> None:
+        self._clock += 1
+        self._cleared_at = self._clock
+        self._views.clear()
+        self._changed.clear()
+
+
+player_views = PlayerViews()
+
+
+def record_player_changes(
+    session: AsyncSession, player_ids: Iterable[uuid.UUID], *views: str
+) -> None:
+    """Drop the given views of ``player_ids`` once the session commits."""
+
+    for player_id in player_ids:
+        _pending(session, player_id).update(dict.fromkeys(views))
+
+
+def record_balance(
+    session: AsyncSession, player_id: uuid.UUID, balance: Optional[int]
+) -> None:
+    """Store ``balance`` for the player once the session commits; ``None`` if the
+    writer does not know the resulting value."""
+
+    _pending(session, player_id)["balance"] = balance
+
+
+def _pending(session: AsyncSession, player_id: uuid.UUID) -> Dict[str, Any]:
+    changes: Optional[Dict[uuid.UUID, Dict[str, Any]]] = session.info.get(
+        "player_views"
+    )
+    if changes is None:
+        changes = session.info["player_views"] = {}
+        on_commit(session, partial(session.info.pop, "player_views", None))
+        on_commit(session, partial(player_views.finish_write, changes, True))
+        on_rollback(session, partial(session.info.pop, "player_views", None))
+        on_rollback(session, partial(player_views.finish_write, changes, False))
+    if player_id not in changes:
+        player_views.begin_write(player_id)
+        changes[player_id] = {}
+    return changes[player_id]
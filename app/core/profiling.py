@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger("app.ticks")
+
+current_profiler: ContextVar[Optional["TickProfiler"]] = ContextVar(
+    "current_profiler", default=None
+)
+
+tick_phase_seconds = metrics.histogram(
+    "cb_tick_phase_seconds", "Time spent in each tick phase.", ["phase"]
+)
+tick_action_seconds = metrics.histogram(
+    "cb_tick_action_seconds", "Apply latency per action type.", ["type"]
+)
+tick_duration_seconds = metrics.histogram(
+    "cb_tick_duration_seconds", "Wall time of a committed tick, including commit."
+)
+tick_sql_statements = metrics.histogram(
+    "cb_tick_sql_statements",
+    "SQL statements executed per tick.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+ticks_total = metrics.counter("cb_ticks_total", "Committed ticks.")
+tick_actions_total = metrics.counter(
+    "cb_tick_actions_total", "Actions applied by committed ticks.", ["type"]
+)
+
+
+class TickProfiler:
+    def __init__(self, tick: int) -> None:
+        self.tick = tick
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.actions: Dict[str, list] = {}
+        self.statements = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def record_action(self, action_type: str, seconds: float) -> None:
+        self.actions.setdefault(action_type, []).append(seconds)
+
+    def attach(self, session: Any) -> None:
+        """Finish the profile when ``session`` commits; its commit becomes a phase."""
+
+        session.info["tick_profiler"] = self
+
+    def finish(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self.started
+        for name, seconds in self.phases.items():
+            tick_phase_seconds.observe(seconds, phase=name)
+        for action_type, samples in self.actions.items():
+            for seconds in samples:
+                tick_action_seconds.observe(seconds, type=action_type)
+            tick_actions_total.inc(len(samples), type=action_type)
+        tick_duration_seconds.observe(total)
+        tick_sql_statements.observe(self.statements)
+        ticks_total.inc()
+        record = self.summary(total)
+        logger.info("tick.profile", **record)
+        return record
+
+    def summary(self, total: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "tick": self.tick,
+            "duration_ms": round(1000 * (total or time.perf_counter() - self.started), 3),
+            "phases_ms": {name: round(1000 * value, 3) for name, value in self.phases.items()},
+            "actions": {
+                action_type: {
+                    "count": len(samples),
+                    "total_ms": round(1000 * sum(samples), 3),
+                }
+                for action_type, samples in self.actions.items()
+            },
+            "sql_statements": self.statements,
+        }
+
+
+def _count_statement(*_: Any) -> None:
+    profiler = current_profiler.get()
+    if profiler is not None:
+        profiler.statements += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _count_statement)
+
+
+@event.listens_for(Session, "before_commit")
+def _start_commit_phase(session: Session) -> None:
+    if "tick_profiler" in session.info:
+        session.info["tick_commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _finish_tick_profile(session: Session) -> None:
+    profiler: Optional[TickProfiler] = session.info.pop("tick_profiler", None)
+    started = session.info.pop("tick_commit_started", None)
+    if profiler is None:
+        return
+    if started is not None:
+        profiler.phases["commit"] = time.perf_counter() - started
+    profiler.finish()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_tick_profile(session: Session) -> None:
+    session.info.pop("tick_profiler", None)
+    session.info.pop("tick_commit_started", None)
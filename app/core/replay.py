@@ -60,7 +60,14 @@ async def verify_replay(
     )
     result = await session.execute(stmt)
     rows = result.scalars().all()
+    # Anchor on the hash stored for the tick before the range, as ticks chain it.
     prev_hash = "0" * 64
+    if start > 1:
+        anchor_stmt = select(models.ReplayLog.state_hash).where(
+            models.ReplayLog.tick == start - 1
+        )
+        anchor = await session.scalar(anchor_stmt)
+        prev_hash = anchor or prev_hash
     for row in rows:
         expected = compute_state_hash(
             state_snapshot={"tick": row.tick},
@@ -1,13 +1,114 @@
 from __future__ import annotations
 
+import hashlib
 import random
-from dataclasses import dataclass
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import List, MutableSequence, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_BLOCK_WORDS = 8  # one 64-byte BLAKE2b digest = eight little-endian uint64 words
+_DOUBLE_SCALE = 2.0**-53
+
+
+class KeyedStream:
+    """Counter-based random stream: word ``n`` comes from BLAKE2b(key, id, n // 8).
+
+    Output is defined purely by the key, stream id and position, so it is stable
+    across Python versions and platforms, and any stream can be created in O(1).
+    """
+
+    __slots__ = ("_base", "_position", "_block_index", "_block")
+
+    def __init__(self, key: bytes, stream_id: bytes) -> None:
+        self._base = hashlib.blake2b(key=key, digest_size=64)
+        # Length-prefix the id so (id, counter) pairs can never collide.
+        self._base.update(len(stream_id).to_bytes(4, "little") + stream_id)
+        self._position = 0
+        self._block_index = -1
+        self._block: Sequence[int] = ()
+
+    def _block_bytes(self, index: int) -> bytes:
+        hasher = self._base.copy()
+        hasher.update(index.to_bytes(8, "little"))
+        return hasher.digest()
+
+    def _words(self, data: bytes) -> array:
+        words = array("Q", data)
+        if sys.byteorder == "big":
+            words.byteswap()
+        return words
+
+    def next_u64(self) -> int:
+        index, offset = divmod(self._position, _BLOCK_WORDS)
+        if index != self._block_index:
+            self._block = self._words(self._block_bytes(index))
+            self._block_index = index
+        self._position += 1
+        return self._block[offset]
+
+    def fill_u64(self, count: int) -> array:
+        """Draw ``count`` words at once; equivalent to ``count`` calls of ``next_u64``."""
+
+        if count <= 0:
+            return array("Q")
+        first, offset = divmod(self._position, _BLOCK_WORDS)
+        last = (self._position + count - 1) // _BLOCK_WORDS
+        data = b"".join(self._block_bytes(index) for index in range(first, last + 1))
+        self._position += count
+        return self._words(data[offset * 8 : (offset + count) * 8])
+
+    def random(self) -> float:
+        return (self.next_u64() >> 11) * _DOUBLE_SCALE
+
+    def fill_random(self, count: int) -> array:
+        return array("d", [(word >> 11) * _DOUBLE_SCALE for word in self.fill_u64(count)])
+
+    def randbelow(self, n: int) -> int:
+        if not 0 < n <= 2**64:
+            raise ValueError("n must be in (0, 2**64]")
+        shift = 64 - max((n - 1).bit_length(), 1)
+        while True:
+            value = self.next_u64() >> shift
+            if value < n:
+                return value
+
+    def randint(self, a: int, b: int) -> int:
+        return a + self.randbelow(b - a + 1)
+
+    def choice(self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randbelow(len(seq))]
+
+    def shuffle(self, items: MutableSequence[T]) -> None:
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randbelow(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+    def sample(self, population: Sequence[T], k: int) -> List[T]:
+        pool = list(population)
+        if not 0 <= k <= len(pool):
+            raise ValueError("Sample larger than population")
+        for i in range(k):
+            j = i + self.randbelow(len(pool) - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
 
 
 @dataclass(slots=True)
 class DeterministicRNG:
     seed: str
+    _key: bytes = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._key = hashlib.blake2b(self.seed.encode("utf-8"), digest_size=32).digest()
 
     def for_tick(self, tick: int, action_id: str) -> random.Random:
         composite_seed = f"{self.seed}:{tick}:{action_id}"
         return random.Random(composite_seed)
+
+    def stream(self, tick: int, action_id: str) -> KeyedStream:
+        return KeyedStream(self._key, f"{tick}:{action_id}".encode("utf-8"))
@@ -23,6 +23,26 @@ class EntitySchema(BaseModel):
     version: int
 
 
+class EntityCreateRequest(BaseModel):
+    type: str
+    pos: Optional[Dict[str, Any]] = None
+    attrs: Dict[str, Any] = Field(default_factory=dict)
+
+
+class EntityPatchRequest(BaseModel):
+    pos: Optional[Dict[str, Any]] = None
+    attrs: Optional[Dict[str, Any]] = None
+
+
+class EntityUpdateRequest(EntityPatchRequest):
+    entity_id: uuid.UUID
+    version: int
+
+
+class EntityUpdatesRequest(BaseModel):
+    updates: List[EntityUpdateRequest]
+
+
 class ActionSchema(BaseModel):
     type: str
     actor_id: uuid.UUID
@@ -48,6 +68,16 @@ class MarketListingSchema(BaseModel):
         populate_by_name = True
 
 
+class OHLCVBarSchema(BaseModel):
+    start_tick: int
+    open: int
+    high: int
+    low: int
+    close: int
+    volume: int
+    notional: int
+
+
 class CurrencyPacketSchema(BaseModel):
     id: uuid.UUID
     denom: Denomination
@@ -58,6 +88,7 @@ class CurrencyPacketSchema(BaseModel):
 class EventSchema(BaseModel):
     id: uuid.UUID
     tick: int
+    seq: int = 0
     kind: str
     subject_id: Optional[uuid.UUID] = None
     payload: Dict[str, Any]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi import Response
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered with orjson; pre-encoded bytes are sent as-is."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def encode_rows(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode column tuples as a JSON array of objects in a single pass."""
+
+    return orjson.dumps([dict(zip(columns, row, strict=True)) for row in rows])
+
+
+def rows_response(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> ORJSONResponse:
+    return ORJSONResponse(content=encode_rows(columns, rows))
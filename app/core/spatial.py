@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+Point = Tuple[float, float]
+Cell = Tuple[int, int]
+
+# (entity_id, position); a ``None`` position drops the entity from the index.
+PositionChange = Tuple[uuid.UUID, Optional[Point]]
+
+DEFAULT_CELL_SIZE = 16.0
+
+
+def entity_point(pos: Optional[Dict[str, Any]]) -> Optional[Point]:
+    """``(x, y)`` from an entity's ``pos`` blob, or ``None`` if it has no position."""
+
+    if not isinstance(pos, dict):
+        return None
+    try:
+        x, y = float(pos["x"]), float(pos["y"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return x, y
+
+
+class SpatialGrid:
+    """Uniform grid hash over entity positions.
+
+    Each entity sits in the cell ``floor(x / cell_size), floor(y / cell_size)``.
+    Queries only visit cells overlapping the query area, so their cost follows
+    the number of nearby entities rather than the size of the world.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[uuid.UUID]] = {}
+        self._points: Dict[uuid.UUID, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def load(self, points: Iterable[Tuple[uuid.UUID, Point]]) -> None:
+        self.clear()
+        self.apply(points)
+
+    def apply(self, changes: Iterable[PositionChange]) -> None:
+        for entity_id, point in changes:
+            self.remove(entity_id)
+            if point is not None:
+                self._points[entity_id] = point
+                self._cells.setdefault(self._cell(*point), set()).add(entity_id)
+
+    def remove(self, entity_id: uuid.UUID) -> None:
+        point = self._points.pop(entity_id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        members.discard(entity_id)
+        if not members:
+            del self._cells[cell]
+
+    def _cells_in(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> Iterator[Set[uuid.UUID]]:
+        low_x, low_y = self._cell(min_x, min_y)
+        high_x, high_y = self._cell(max_x, max_y)
+        span = (high_x - low_x + 1) * (high_y - low_y + 1)
+        if span > len(self._cells):
+            # A query wider than the occupied area: walk occupied cells instead.
+            for (cx, cy), members in self._cells.items():
+                if low_x <= cx <= high_x and low_y <= cy <= high_y:
+                    yield members
+            return
+        for cx in range(low_x, high_x + 1):
+            for cy in range(low_y, high_y + 1):
+                members = self._cells.get((cx, cy))
+                if members:
+                    yield members
+
+    def within(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> List[uuid.UUID]:
+        """Entities inside the bounding box, edges included."""
+
+        found: List[uuid.UUID] = []
+        for members in self._cells_in(min_x, min_y, max_x, max_y):
+            for entity_id in members:
+                x, y = self._points[entity_id]
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    found.append(entity_id)
+        return found
+
+    def near(self, x: float, y: float, radius: float) -> List[Tuple[uuid.UUID, float]]:
+        """Entities within ``radius`` of ``(x, y)``, nearest first, with distances."""
+
+        found: List[Tuple[uuid.UUID, float]] = []
+        for members in self._cells_in(x - radius, y - radius, x + radius, y + radius):
+            for entity_id in members:
+                px, py = self._points[entity_id]
+                distance = math.hypot(px - x, py - y)
+                if distance <= radius:
+                    found.append((entity_id, distance))
+        found.sort(key=lambda entry: (entry[1], str(entry[0])))
+        return found
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+
+entity_grid = SpatialGrid()
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import uuid
+from functools import partial
 from typing import Dict, List
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import events, replay
+from app.core.config import get_settings
+from app.core.order_book import order_book
+from app.core.player_views import player_views
+from app.core.profiling import TickProfiler, current_profiler
+from app.core.world_cache import WorldSnapshot, world_cache
 from app.domain import models
 from app.domain.rules.base_ruleset import ValidationError
+from app.domain.rules.registry import registry
 from app.domain.services.action_service import ActionService
+from app.domain.services.entity_service import (
+    EntityService,
+    EntityUpdate,
+    tick_entity_updates,
+)
 from app.domain.services.market_service import MarketService
+from app.domain.services.matching_service import MatchingEngine
+from app.infra.db import on_commit
+from app.infra.intake_log import get_intake_log
 
 
 class TickManager:
@@ -26,51 +42,141 @@ class TickManager:
             await self.session.flush()
         return world
 
-    async def get_world_state(self) -> models.World:
-        return await self.ensure_world()
+    async def get_world_state(self) -> WorldSnapshot:
+        snapshot = world_cache.get()
+        if snapshot is None:
+            generation = world_cache.generation
+            snapshot = WorldSnapshot.from_model(await self.ensure_world())
+            world_cache.fill(snapshot, generation)
+        return snapshot
 
-    async def enqueue_actions(self, *, actions: List[Dict[str, object]]) -> List[models.Action]:
-        world = await self.ensure_world()
-        return await self.action_service.enqueue_actions(tick=world.tick, actions=actions)
+    async def current_tick(self) -> int:
+        return (await self.get_world_state()).tick
+
+    async def enqueue_actions(self, *, actions: List[Dict[str, object]]) -> List[uuid.UUID]:
+        tick = await self.current_tick()
+        return await self.action_service.enqueue_actions(tick=tick, actions=actions)
 
     async def advance_tick(self) -> Dict[str, object]:
+        # Tick boundary: a staged ruleset swap takes effect before any action runs.
+        registry.activate_staged()
         world = await self.ensure_world()
         current_tick = world.tick
-        applied_actions = await self.action_service.apply_actions(tick=current_tick)
-        world.tick += 1
-        await self.session.flush()
-
-        await events.record_event(
-            self.session,
-            tick=world.tick,
-            kind="tick.advance",
-            subject_id=None,
-            payload={"tick": world.tick},
-        )
+        profiler = TickProfiler(current_tick + 1)
+        token = current_profiler.set(profiler)
+        staged: List[EntityUpdate] = []
+        staged_token = tick_entity_updates.set(staged)
+        try:
+            with profiler.phase("apply"):
+                applied_actions = await self.action_service.apply_actions(
+                    tick=current_tick, seed=world.seed
+                )
+            tick_entity_updates.reset(staged_token)
+            with profiler.phase("match"):
+                fills = [
+                    fill.as_dict()
+                    for fill in await MatchingEngine(self.session).match(tick=current_tick)
+                ]
+            with profiler.phase("entities"):
+                entity_updates = await self._apply_entity_updates(current_tick, staged)
+            replay_actions = list(applied_actions)
+            if fills:
+                # Fills are derived state, but hashing them pins the matching outcome.
+                replay_actions.append(
+                    {
+                        "id": f"match:{current_tick}",
+                        "type": "market.match",
+                        "payload": {},
+                        "result": {"fills": fills},
+                    }
+                )
+            if staged:
+                replay_actions.append(
+                    {
+                        "id": f"entities:{current_tick}",
+                        "type": "entity.cas",
+                        "payload": {},
+                        "result": entity_updates,
+                    }
+                )
+            world.tick += 1
+            with profiler.phase("event_flush"):
+                await self.session.flush()
+                await events.record_event(
+                    self.session,
+                    tick=world.tick,
+                    kind="tick.advance",
+                    subject_id=None,
+                    payload={"tick": world.tick},
+                )
+
+            with profiler.phase("snapshot"):
+                state_snapshot = await self._snapshot_state(world.tick)
+            with profiler.phase("hash"):
+                previous_hash = await self._previous_hash(world.tick)
+                await replay.append_replay_log(
+                    self.session,
+                    tick=world.tick,
+                    state_snapshot=state_snapshot,
+                    actions=replay_actions,
+                    previous_hash=previous_hash,
+                )
+        finally:
+            if tick_entity_updates.get() is staged:
+                tick_entity_updates.reset(staged_token)
+            current_profiler.reset(token)
+        profiler.attach(self.session)
+        on_commit(self.session, partial(world_cache.push, WorldSnapshot.from_model(world)))
+        # Registered after the tick's own book changes, so they land in this delta.
+        on_commit(self.session, partial(order_book.flush, world.tick))
+        if get_settings().action_intake == "log":
+            on_commit(self.session, partial(get_intake_log().discard_through, current_tick))
+        return {
+            "tick": world.tick,
+            "applied": applied_actions,
+            "fills": fills,
+            "entity_updates": entity_updates,
+            "profile": profiler.summary(),
+        }
 
-        state_snapshot = await self._snapshot_state(world.tick)
-        previous_hash = await self._previous_hash(world.tick)
-        await replay.append_replay_log(
-            self.session,
-            tick=world.tick,
-            state_snapshot=state_snapshot,
-            actions=applied_actions,
-            previous_hash=previous_hash,
+    async def _apply_entity_updates(
+        self, tick: int, staged: List[EntityUpdate]
+    ) -> Dict[str, object]:
+        applied, conflicts = await EntityService(self.session).apply_updates(
+            tick=tick, updates=staged
         )
-        return {"tick": world.tick, "applied": applied_actions}
+        return {
+            "applied": [
+                {"entity_id": str(entry.entity_id), "version": version}
+                for entry, version in applied
+            ],
+            "conflicts": [
+                {
+                    "entity_id": str(entry.entity_id),
+                    "expected_version": entry.expected_version,
+                }
+                for entry in conflicts
+            ],
+        }
 
     async def _snapshot_state(self, tick: int) -> Dict[str, object]:
         players_stmt = select(models.Player.id, models.Player.balance_mamp).order_by(
             models.Player.id
         )
+        stamp = player_views.stamp()
         players_result = await self.session.execute(players_stmt)
+        balances = [
+            (player_id, int(balance)) for player_id, balance in players_result.tuples()
+        ]
+        # Every balance as of this tick; the cache takes the ones nobody rewrote since.
+        on_commit(self.session, partial(player_views.push_balances, balances, stamp))
         players = [
-            {"id": str(row.id), "balance_mamp": int(row.balance_mamp)}
-            for row in players_result
+            {"id": str(player_id), "balance_mamp": balance}
+            for player_id, balance in balances
         ]
-        listings_stmt = select(models.MarketListing.id, models.MarketListing.status).order_by(
-            models.MarketListing.id
-        )
+        listings_stmt = select(
+            models.MarketListing.id, models.MarketListing.status
+        ).order_by(models.MarketListing.id)
         listings_result = await self.session.execute(listings_stmt)
         listings = [
             {"id": str(row.id), "status": row.status.value}
@@ -98,7 +204,7 @@ async def enqueue_with_validation(
     manager: TickManager,
     *,
     actions: List[Dict[str, object]],
-) -> List[models.Action]:
+) -> List[uuid.UUID]:
     try:
         return await manager.enqueue_actions(actions=actions)
     except ValidationError as exc:  # pragma: no cover - defensive
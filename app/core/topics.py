@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.events import Cursor, event_cursor
+from app.core.wire import EncodedEvent
+from app.infra.redis import pubsub
+
+EVENTS_CHANNEL = "events"
+ALL_TOPIC = "*"
+
+
+def event_topics(event: Dict[str, Any]) -> List[str]:
+    """Topics an event is published under.
+
+    ``kind:<prefix>`` for every dotted prefix of the kind (``kind:market`` and
+    ``kind:market.listing_filled``), ``subject:<id>`` for its subject and, for
+    trades, the buyer.
+    """
+
+    topics = [ALL_TOPIC]
+    parts = str(event.get("kind", "")).split(".")
+    topics.extend(f"kind:{'.'.join(parts[:end])}" for end in range(1, len(parts) + 1))
+    if event.get("subject_id"):
+        topics.append(f"subject:{event['subject_id']}")
+    buyer_id = (event.get("payload") or {}).get("buyer_id")
+    if buyer_id:
+        topics.append(f"subject:{buyer_id}")
+    return topics
+
+
+def resolve_topics(topics: Iterable[str], player_id: Optional[uuid.UUID]) -> List[str]:
+    """Validate client topics; ``player:self`` becomes the caller's subject topic."""
+
+    resolved: List[str] = []
+    for topic in topics:
+        topic = topic.strip()
+        if topic == ALL_TOPIC or (topic.startswith("kind:") and len(topic) > 5):
+            resolved.append(topic)
+        elif topic.startswith("subject:"):
+            resolved.append(f"subject:{uuid.UUID(topic[8:])}")
+        elif topic == "player:self":
+            if player_id is None:
+                raise ValueError("player:self requires a token")
+            resolved.append(f"subject:{player_id}")
+        else:
+            raise ValueError(f"unknown topic {topic!r}")
+    return resolved
+
+
+class Subscription:
+    __slots__ = ("deliver", "topics")
+
+    def __init__(self, deliver: Callable[[EncodedEvent, Cursor], None]) -> None:
+        self.deliver = deliver
+        self.topics: Set[str] = set()
+
+
+class TopicIndex:
+    """Routes events to subscriptions through a topic -> subscriptions index.
+
+    Each event is wrapped once and the same ``EncodedEvent`` is handed to every
+    matching subscription, so it is encoded at most once per wire format. The
+    index only listens on the pub/sub channel while it has subscriptions.
+    """
+
+    def __init__(self, channel: str = EVENTS_CHANNEL) -> None:
+        self.channel = channel
+        self._index: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def open(self, deliver: Callable[[EncodedEvent, Cursor], None]) -> Subscription:
+        if not self._subscriptions:
+            pubsub.subscribe(self.channel, self.dispatch)
+        subscription = Subscription(deliver)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def close(self, subscription: Subscription) -> None:
+        self.remove(subscription, list(subscription.topics))
+        self._subscriptions.discard(subscription)
+        if not self._subscriptions:
+            pubsub.unsubscribe(self.channel, self.dispatch)
+
+    def add(self, subscription: Subscription, topics: Iterable[str]) -> None:
+        for topic in topics:
+            subscription.topics.add(topic)
+            self._index.setdefault(topic, set()).add(subscription)
+
+    def remove(self, subscription: Subscription, topics: Iterable[str]) -> None:
+        for topic in topics:
+            subscription.topics.discard(topic)
+            subscribers = self._index.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._index[topic]
+
+    def matches(self, subscription: Subscription, event: Dict[str, Any]) -> bool:
+        return not subscription.topics.isdisjoint(event_topics(event))
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        matched: Set[Subscription] = set()
+        for topic in event_topics(event):
+            subscribers = self._index.get(topic)
+            if subscribers:
+                matched.update(subscribers)
+        if not matched:
+            return
+        encoded = EncodedEvent(event)
+        cursor = event_cursor(event)
+        for subscription in matched:
+            subscription.deliver(encoded, cursor)
+
+
+event_index = TopicIndex()
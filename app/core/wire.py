@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import uuid
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.events import Cursor
+
+try:  # Optional: pip install circuit-breakers[msgpack]
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without the extra
+    msgpack = None
+
+SUBPROTOCOL_JSON = "cb.json"
+SUBPROTOCOL_MSGPACK = "cb.msgpack"
+
+# Event fields carried as raw 16-byte UUIDs in binary formats.
+UUID_FIELDS = ("id", "subject_id")
+
+
+class WireFormat:
+    """How one WebSocket connection encodes frames.
+
+    ``encode_event`` produces the encoding of a single event so it can be shared
+    between subscribers; ``batch`` splices already-encoded events into one
+    ``{"events": [...]}`` frame without decoding them again.
+    """
+
+    name = "json"
+    subprotocol = SUBPROTOCOL_JSON
+    binary = False
+
+    def encode(self, message: Any) -> bytes:
+        return orjson.dumps(message)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def encode_event(self, event: Dict[str, Any]) -> bytes:
+        return orjson.dumps(event)
+
+    def batch(self, events: Sequence[bytes]) -> bytes:
+        return b'{"events":[' + b",".join(events) + b"]}"
+
+    async def send(self, websocket: WebSocket, data: bytes) -> None:
+        if self.binary:
+            await websocket.send_bytes(data)
+        else:
+            await websocket.send_text(data.decode("utf-8"))
+
+    async def receive(self, websocket: WebSocket) -> Any:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        text = message.get("text")
+        return self.decode(text if text is not None else message["bytes"])
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    raise TypeError(f"cannot serialize {type(value).__name__}")
+
+
+class MsgpackFormat(WireFormat):
+    """MessagePack frames; event ids travel as 16 raw bytes instead of 36 chars."""
+
+    name = "msgpack"
+    subprotocol = SUBPROTOCOL_MSGPACK
+    binary = True
+
+    def __init__(self) -> None:
+        self._events_key = msgpack.packb("events")
+
+    def encode(self, message: Any) -> bytes:
+        return msgpack.packb(message, default=_msgpack_default)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return msgpack.unpackb(data)
+
+    def encode_event(self, event: Dict[str, Any]) -> bytes:
+        compact = dict(event)
+        for field in UUID_FIELDS:
+            if compact.get(field):
+                compact[field] = uuid.UUID(compact[field]).bytes
+        return self.encode(compact)
+
+    def batch(self, events: Sequence[bytes]) -> bytes:
+        header = msgpack.Packer().pack_array_header(len(events))
+        return b"\x81" + self._events_key + header + b"".join(events)
+
+
+JSON = WireFormat()
+FORMATS: Dict[str, WireFormat] = {JSON.subprotocol: JSON}
+if msgpack is not None:
+    FORMATS[SUBPROTOCOL_MSGPACK] = MsgpackFormat()
+
+
+def negotiate(requested: Iterable[str]) -> Optional[WireFormat]:
+    """First requested subprotocol we can speak; ``None`` if none match."""
+
+    for subprotocol in requested:
+        wire = FORMATS.get(subprotocol)
+        if wire is not None:
+            return wire
+    return None
+
+
+async def accept(websocket: WebSocket) -> WireFormat:
+    """Accept ``websocket`` with its negotiated format; plain JSON by default."""
+
+    wire = negotiate(websocket.scope.get("subprotocols") or ())
+    await websocket.accept(subprotocol=wire.subprotocol if wire else None)
+    return wire or JSON
+
+
+class EncodedEvent:
+    """An event shared by every subscriber, encoded at most once per format."""
+
+    __slots__ = ("event", "_encoded")
+
+    def __init__(self, event: Dict[str, Any]) -> None:
+        self.event = event
+        self._encoded: Dict[str, bytes] = {}
+
+    @property
+    def tick(self) -> int:
+        return int(self.event.get("tick", 0))
+
+    def encoded(self, wire: WireFormat) -> bytes:
+        data = self._encoded.get(wire.name)
+        if data is None:
+            data = self._encoded[wire.name] = wire.encode_event(self.event)
+        return data
+
+
+def encode_events(wire: WireFormat, events: Iterable[EncodedEvent]) -> bytes:
+    parts: List[bytes] = [event.encoded(wire) for event in events]
+    return wire.batch(parts)
+
+
+QueuedFrame = Tuple[Union[EncodedEvent, bytes], Optional[Cursor]]
+
+
+def tick_frames(
+    wire: WireFormat, items: Iterable[QueuedFrame], replayed: Optional[Set[Cursor]]
+) -> Iterator[bytes]:
+    """Coalesce consecutive queued events of one tick into a single frame.
+
+    Events whose cursor is in ``replayed`` were already sent by the replay and are
+    dropped; each cursor is removed from the set once its live copy shows up.
+    """
+
+    batch: List[EncodedEvent] = []
+    for data, cursor in items:
+        if isinstance(data, EncodedEvent):
+            if replayed and cursor is not None and cursor in replayed:
+                replayed.discard(cursor)
+                continue
+            if batch and batch[-1].tick != data.tick:
+                yield encode_events(wire, batch)
+                batch = []
+            batch.append(data)
+        else:
+            if batch:
+                yield encode_events(wire, batch)
+                batch = []
+            yield data
+    if batch:
+        yield encode_events(wire, batch)
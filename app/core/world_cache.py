@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain import models
+
+
+@dataclass(frozen=True, slots=True)
+class WorldSnapshot:
+    tick: int
+    seed: int
+    ruleset_version: str
+
+    @classmethod
+    def from_model(cls, world: models.World) -> "WorldSnapshot":
+        return cls(
+            tick=int(world.tick),
+            seed=int(world.seed),
+            ruleset_version=str(world.ruleset_version),
+        )
+
+
+class WorldCache:
+    """Process-wide copy of the world row, replaced whenever a tick commits."""
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[WorldSnapshot] = None
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self) -> Optional[WorldSnapshot]:
+        return self._snapshot
+
+    def fill(self, snapshot: WorldSnapshot, generation: int) -> None:
+        # A load that raced with a push must not overwrite the newer state.
+        if generation == self._generation and self._snapshot is None:
+            self._snapshot = snapshot
+
+    def push(self, snapshot: WorldSnapshot) -> None:
+        self._generation += 1
+        self._snapshot = snapshot
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._snapshot = None
+
+
+world_cache = WorldCache()
@@ -5,7 +5,17 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy import JSON, BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -83,6 +93,25 @@ class MarketListing(Base):
     seller: Mapped[Player] = relationship(Player)
 
 
+class MarketBid(Base):
+    __tablename__ = "market_bid"
+
+    id: Mapped[uuid.UUID] = mapped_column(default=uuid.uuid4, primary_key=True)
+    bidder_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("player.id"))
+    item_type: Mapped[str] = mapped_column(String(64), index=True)
+    price_amp_bigint: Mapped[int] = mapped_column(BigInteger)
+    escrow_mamp: Mapped[int] = mapped_column(BigInteger)
+    status: Mapped[MarketStatus] = mapped_column(Enum(MarketStatus), default=MarketStatus.open)
+    created_tick: Mapped[int] = mapped_column(Integer)
+    placed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    filled_tick: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    fill_price_amp: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    listing_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("market_listing.id"), nullable=True
+    )
+    bidder: Mapped[Player] = relationship(Player)
+
+
 class Action(Base):
     __tablename__ = "action"
 
@@ -100,9 +129,12 @@ class Action(Base):
 
 class Event(Base):
     __tablename__ = "event"
+    __table_args__ = (Index("ix_event_tick_seq", "tick", "seq", unique=True),)
 
     id: Mapped[uuid.UUID] = mapped_column(default=uuid.uuid4, primary_key=True)
     tick: Mapped[int] = mapped_column(Integer)
+    # Position within the tick; (tick, seq) is the stream resume cursor.
+    seq: Mapped[int] = mapped_column(Integer, default=0)
     kind: Mapped[str] = mapped_column(String(64))
     subject_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
     payload: Mapped[Dict[str, Any]] = mapped_column(json_variant, default=dict)
@@ -148,6 +180,7 @@ __all__ = [
     "Denomination",
     "Entity",
     "Event",
+    "MarketBid",
     "MarketListing",
     "MarketStatus",
     "Player",
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Protocol
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Protocol
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rng import DeterministicRNG, KeyedStream
+
 
 class ValidationError(Exception):
     pass
@@ -26,11 +29,69 @@ class ActionDefinition:
     applier: Applier
 
 
+class ActionContext:
+    """Per-run context handed to validators and appliers; reused across actions."""
+
+    __slots__ = ("session", "tick", "action", "_rng", "_stream")
+
+    def __init__(self, session: AsyncSession, tick: int, seed: int) -> None:
+        self.session = session
+        self.tick = tick
+        self.action: Any = None
+        self._rng = DeterministicRNG(str(seed))
+        self._stream: KeyedStream | None = None
+
+    def bind(self, action: Any) -> "ActionContext":
+        self.action = action
+        self._stream = None
+        return self
+
+    @property
+    def rng(self) -> KeyedStream:
+        if self._stream is None:
+            self._stream = self._rng.stream(self.tick, str(self.action.id))
+        return self._stream
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAction:
+    name: str
+    validator: Validator
+    applier: Applier
+
+
+@dataclass(frozen=True)
+class DispatchTable:
+    ruleset: str
+    entries: Mapping[str, CompiledAction]
+
+    def get(self, name: str) -> Optional[CompiledAction]:
+        return self.entries.get(name)
+
+    def context(self, session: AsyncSession, tick: int, seed: int = 0) -> ActionContext:
+        return ActionContext(session, tick, seed)
+
+
 class Ruleset:
     name: str
 
     def __init__(self, name: str) -> None:
         self.name = name
+        self.actions: Dict[str, ActionDefinition] = {}
+
+    def register_action(self, definition: ActionDefinition) -> None:
+        self.actions[definition.name] = definition
+
+    def compile(self) -> DispatchTable:
+        entries = {
+            name: CompiledAction(
+                name=name,
+                validator=definition.validator,
+                applier=definition.applier,
+            )
+            for name, definition in self.actions.items()
+        }
+        return DispatchTable(ruleset=self.name, entries=MappingProxyType(entries))
 
     async def setup(self, session: AsyncSession) -> None:  # pragma: no cover - hook
         return None
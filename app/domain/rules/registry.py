@@ -1,24 +1,70 @@
 from __future__ import annotations
 
-from typing import Dict
+import importlib
+from importlib.metadata import entry_points
+from typing import Dict, Optional
 
-from app.domain.rules.base_ruleset import ActionDefinition
+from app.core.config import get_settings
+from app.domain.rules.base_ruleset import CompiledAction, DispatchTable, Ruleset
+
+ENTRY_POINT_GROUP = "circuit_breakers.rulesets"
+
+
+def load_ruleset(name: str, *, reload: bool = False) -> Ruleset:
+    """Resolve a ruleset by entry point, falling back to ``app.domain.rules.<name>``."""
+
+    matches = entry_points(group=ENTRY_POINT_GROUP, name=name)
+    if matches:
+        entry_point = next(iter(matches))
+        module_name, _, attr = entry_point.value.partition(":")
+    else:
+        module_name, attr = f"app.domain.rules.{name}", "ruleset"
+    module = importlib.import_module(module_name)
+    if reload:
+        module = importlib.reload(module)
+    ruleset = getattr(module, attr or "ruleset")
+    if not isinstance(ruleset, Ruleset):
+        raise TypeError(f"{module_name}:{attr} is not a Ruleset")
+    return ruleset
 
 
 class RulesetRegistry:
+    """Holds the active ruleset's compiled dispatch table.
+
+    ``stage`` prepares a replacement which ``activate_staged`` swaps in; the tick
+    loop calls it at the start of every tick so a swap never splits a tick.
+    """
+
     def __init__(self) -> None:
-        self._actions: Dict[str, ActionDefinition] = {}
+        self._table: Optional[DispatchTable] = None
+        self._staged: Optional[DispatchTable] = None
+
+    def activate(self, name: str) -> DispatchTable:
+        self._table = load_ruleset(name).compile()
+        return self._table
+
+    def stage(self, name: str, *, reload: bool = False) -> DispatchTable:
+        self._staged = load_ruleset(name, reload=reload).compile()
+        return self._staged
+
+    def activate_staged(self) -> DispatchTable:
+        if self._staged is not None:
+            self._table, self._staged = self._staged, None
+        return self.table()
 
-    def register_action(self, definition: ActionDefinition) -> None:
-        self._actions[definition.name] = definition
+    def table(self) -> DispatchTable:
+        if self._table is None:
+            return self.activate(get_settings().ruleset)
+        return self._table
 
-    def get(self, name: str) -> ActionDefinition:
-        if name not in self._actions:
+    def get(self, name: str) -> CompiledAction:
+        entry = self.table().get(name)
+        if entry is None:
             raise KeyError(f"Unknown action: {name}")
-        return self._actions[name]
+        return entry
 
-    def actions(self) -> Dict[str, ActionDefinition]:
-        return dict(self._actions)
+    def actions(self) -> Dict[str, CompiledAction]:
+        return dict(self.table().entries)
 
 
 registry = RulesetRegistry()
@@ -3,10 +3,17 @@ from __future__ import annotations
 import uuid
 
 from app.core import events
-from app.domain.rules.base_ruleset import ActionDefinition, ValidationError
-from app.domain.rules.registry import registry
+from app.core.spatial import entity_point
+from app.domain import models
+from app.domain.rules.base_ruleset import (
+    ActionDefinition,
+    Ruleset,
+    ValidationError,
+)
 from app.domain.services.currency_service import CurrencyService
+from app.domain.services.entity_service import EntityService, stage_entity_updates
 from app.domain.services.market_service import MarketService
+from app.domain.services.matching_service import MatchingEngine
 
 
 async def validate_work(context, payload):  # type: ignore[override]
@@ -44,6 +51,7 @@ async def apply_list_item(context, payload):  # type: ignore[override]
         item_attrs=dict(payload.get("item_attrs", {})),
         price_amp=int(payload["price_amp"]),
         tick=context.tick,
+        placed_at=context.action.received_at,
     )
     await events.record_event(
         context.session,
@@ -72,7 +80,10 @@ async def apply_buy_item(context, payload):  # type: ignore[override]
         tick=context.tick,
         kind="market.listing_filled",
         subject_id=listing.id,
-        payload={"buyer_id": str(context.action.actor_id)},
+        payload={
+            "buyer_id": str(context.action.actor_id),
+            "price_amp": int(listing.price_amp_bigint),
+        },
     )
     return {"listing_id": str(listing.id)}
 
@@ -99,9 +110,152 @@ async def apply_cancel_listing(context, payload):  # type: ignore[override]
     return {"listing_id": str(listing.id)}
 
 
-registry.register_action(ActionDefinition("work", validate_work, apply_work))
-registry.register_action(ActionDefinition("list_item", validate_list_item, apply_list_item))
-registry.register_action(ActionDefinition("buy_item", validate_buy_item, apply_buy_item))
-registry.register_action(
+async def validate_place_bid(context, payload):  # type: ignore[override]
+    if "item_type" not in payload or "price_amp" not in payload:
+        raise ValidationError("item_type and price_amp required")
+    price = int(payload["price_amp"])
+    if price <= 0:
+        raise ValidationError("price must be positive")
+    balance = await CurrencyService(context.session).get_balance(context.action.actor_id)
+    if balance < price:
+        raise ValidationError("Insufficient balance")
+
+
+async def apply_place_bid(context, payload):  # type: ignore[override]
+    engine = MatchingEngine(context.session)
+    bid = await engine.place_bid(
+        bidder_id=context.action.actor_id,
+        item_type=str(payload["item_type"]),
+        price_amp=int(payload["price_amp"]),
+        tick=context.tick,
+        placed_at=context.action.received_at,
+    )
+    await events.record_event(
+        context.session,
+        tick=context.tick,
+        kind="market.bid_placed",
+        subject_id=bid.id,
+        payload={"item_type": bid.item_type, "price_amp": bid.price_amp_bigint},
+    )
+    return {"bid_id": str(bid.id)}
+
+
+async def validate_cancel_bid(context, payload):  # type: ignore[override]
+    if "bid_id" not in payload:
+        raise ValidationError("bid_id required")
+    try:
+        bid_id = uuid.UUID(str(payload["bid_id"]))
+    except ValueError as exc:
+        raise ValidationError("bid_id must be a UUID") from exc
+    # Re-run at apply time, so a bid cancelled or filled earlier in the tick is
+    # rejected instead of failing the whole tick.
+    bid = await context.session.get(models.MarketBid, bid_id)
+    if bid is None:
+        raise ValidationError("Bid not found")
+    if bid.bidder_id != context.action.actor_id:
+        raise ValidationError("Only bidder can cancel bid")
+    if bid.status != models.MarketStatus.open:
+        raise ValidationError("Bid not open")
+
+
+async def apply_cancel_bid(context, payload):  # type: ignore[override]
+    engine = MatchingEngine(context.session)
+    bid = await engine.cancel_bid(
+        bid_id=uuid.UUID(str(payload["bid_id"])),
+        actor_id=context.action.actor_id,
+        tick=context.tick,
+    )
+    await events.record_event(
+        context.session,
+        tick=context.tick,
+        kind="market.bid_cancelled",
+        subject_id=bid.id,
+        payload={},
+    )
+    return {"bid_id": str(bid.id)}
+
+
+async def validate_move_entity(context, payload):  # type: ignore[override]
+    if "entity_id" not in payload or entity_point(payload.get("pos")) is None:
+        raise ValidationError("entity_id and pos with numeric x, y required")
+    entity_id = uuid.UUID(str(payload["entity_id"]))
+    entity = await context.session.get(models.Entity, entity_id)
+    if entity is None or entity.owner_id != context.action.actor_id:
+        raise ValidationError("Entity not owned by actor")
+
+
+async def apply_move_entity(context, payload):  # type: ignore[override]
+    entity = await EntityService(context.session).move_entity(
+        entity_id=uuid.UUID(str(payload["entity_id"])),
+        actor_id=context.action.actor_id,
+        pos=dict(payload["pos"]),
+    )
+    await events.record_event(
+        context.session,
+        tick=context.tick,
+        kind="entity.moved",
+        subject_id=entity.id,
+        payload={"pos": entity.pos},
+    )
+    return {"entity_id": str(entity.id)}
+
+
+MAX_ENTITY_UPDATES = 1000
+
+
+async def validate_update_entities(context, payload):  # type: ignore[override]
+    updates = payload.get("updates")
+    if not isinstance(updates, list) or not 0 < len(updates) <= MAX_ENTITY_UPDATES:
+        raise ValidationError(f"updates must list 1 to {MAX_ENTITY_UPDATES} entries")
+    for entry in updates:
+        if not isinstance(entry, dict) or "entity_id" not in entry:
+            raise ValidationError("Each update needs an entity_id")
+        uuid.UUID(str(entry["entity_id"]))
+        if not isinstance(entry.get("version"), int):
+            raise ValidationError("Each update needs the integer version it expects")
+        if "pos" not in entry and "attrs" not in entry:
+            raise ValidationError("Each update needs pos or attrs")
+        if entry.get("pos") is not None and entity_point(entry["pos"]) is None:
+            raise ValidationError("pos needs numeric x, y")
+        if "attrs" in entry and not isinstance(entry["attrs"], dict):
+            raise ValidationError("attrs must be an object")
+
+
+async def apply_update_entities(context, payload):  # type: ignore[override]
+    # Staged, not written: the tick applies every update in one compare-and-swap
+    # statement after matching and reports the conflicts as events.
+    updates = await EntityService(context.session).prepare_updates(
+        actor_id=context.action.actor_id,
+        requested=payload["updates"],
+        order=(context.action.received_at, str(context.action.id)),
+    )
+    stage_entity_updates(updates)
+    return {"staged": len(updates)}
+
+
+ruleset = Ruleset("season1_dark_grid")
+ruleset.register_action(ActionDefinition("work", validate_work, apply_work))
+ruleset.register_action(
+    ActionDefinition("list_item", validate_list_item, apply_list_item)
+)
+ruleset.register_action(ActionDefinition("buy_item", validate_buy_item, apply_buy_item))
+ruleset.register_action(
     ActionDefinition("cancel_listing", validate_cancel_listing, apply_cancel_listing)
 )
+# Resting orders: asks are ordinary listings, bids escrow funds; both are matched
+# with price-time priority at the tick boundary.
+ruleset.register_action(
+    ActionDefinition("place_ask", validate_list_item, apply_list_item)
+)
+ruleset.register_action(
+    ActionDefinition("place_bid", validate_place_bid, apply_place_bid)
+)
+ruleset.register_action(
+    ActionDefinition("cancel_bid", validate_cancel_bid, apply_cancel_bid)
+)
+ruleset.register_action(
+    ActionDefinition("move_entity", validate_move_entity, apply_move_entity)
+)
+ruleset.register_action(
+    ActionDefinition("update_entities", validate_update_entities, apply_update_entities)
+)
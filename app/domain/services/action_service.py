@@ -1,66 +1,222 @@
 from __future__ import annotations
 
+import time
 import uuid
 from collections import defaultdict
-from typing import Dict, Iterable, List
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, Iterable, List, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.core.profiling import current_profiler
+from app.core.world_cache import world_cache
 from app.domain import models
 from app.domain.rules import registry
-from app.domain.rules.base_ruleset import ValidationError
+from app.domain.rules.base_ruleset import DispatchTable, ValidationError
+from app.infra.db import on_rollback
+from app.infra.intake_log import get_intake_log
 
 PER_TICK_ACTION_LIMIT = 3
 
 
+class ActionQuota:
+    """Per-actor action counts for the current tick, shared by every request."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._epoch: Tuple[int, int] | None = None
+        self._counts: Dict[uuid.UUID, int] = {}
+
+    def is_loaded(self, epoch: Tuple[int, int]) -> bool:
+        return self._epoch == epoch
+
+    def load(self, epoch: Tuple[int, int], counts: Dict[uuid.UUID, int]) -> None:
+        # Epochs are (tick, world generation); never step back to an older one.
+        if self._epoch is None or epoch[1] > self._epoch[1]:
+            self._epoch = epoch
+            self._counts = dict(counts)
+
+    def reserve(self, epoch: Tuple[int, int], requested: Dict[uuid.UUID, int]) -> None:
+        if self._epoch != epoch:
+            raise ValidationError("Tick advanced during enqueue")
+        for actor_id, count in requested.items():
+            if self._counts.get(actor_id, 0) + count > self.limit:
+                raise ValidationError("Action quota exceeded")
+        for actor_id, count in requested.items():
+            self._counts[actor_id] = self._counts.get(actor_id, 0) + count
+
+    def release(self, epoch: Tuple[int, int], requested: Dict[uuid.UUID, int]) -> None:
+        if self._epoch != epoch:
+            return
+        for actor_id, count in requested.items():
+            self._counts[actor_id] = max(self._counts.get(actor_id, 0) - count, 0)
+
+
+action_quota = ActionQuota(PER_TICK_ACTION_LIMIT)
+
+
 class ActionService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self._table: DispatchTable = registry.registry.table()
+        self._seed = 0
 
     async def enqueue_actions(
         self,
         *,
         tick: int,
         actions: Iterable[Dict[str, object]],
-    ) -> List[models.Action]:
-        accepted: List[models.Action] = []
-        counts: Dict[uuid.UUID, int] = defaultdict(int)
-        for action_payload in actions:
+    ) -> List[uuid.UUID]:
+        (result,) = await self.enqueue_batch(tick=tick, submissions=[actions])
+        if isinstance(result, ValidationError):
+            raise result
+        return result
+
+    async def enqueue_batch(
+        self,
+        *,
+        tick: int,
+        submissions: Sequence[Iterable[Dict[str, object]]],
+    ) -> List[List[uuid.UUID] | ValidationError]:
+        """Enqueue several independent submissions with a single write.
+
+        Each submission is validated and charged against the quota on its own, so
+        a rejected one gets its ``ValidationError`` back without affecting the
+        rest; the accepted rows are then inserted (or logged) together.
+        """
+
+        results: List[List[uuid.UUID] | ValidationError] = []
+        rows: List[Dict[str, object]] = []
+        reserved: Dict[uuid.UUID, int] = defaultdict(int)
+        received_at = datetime.now(timezone.utc)
+        epoch = (tick, world_cache.generation)
+        for actions in submissions:
+            try:
+                batch, requested = self._build_rows(
+                    tick, actions, received_at + timedelta(microseconds=len(rows))
+                )
+                if batch:
+                    await self.validate_actions(tick=tick, rows=batch)
+                    if not action_quota.is_loaded(epoch):
+                        action_quota.load(epoch, await self.queued_counts(tick))
+                    action_quota.reserve(epoch, requested)
+            except ValidationError as exc:
+                results.append(exc)
+                continue
+            except (KeyError, TypeError, ValueError) as exc:
+                # A malformed payload must not fail the other submissions.
+                results.append(ValidationError(f"Malformed action: {exc!r}"))
+                continue
+            for actor_id, count in requested.items():
+                reserved[actor_id] += count
+            rows.extend(batch)
+            results.append([row["id"] for row in batch])
+        if not rows:
+            return results
+
+        if get_settings().action_intake == "log":
+            try:
+                await get_intake_log().append(tick, rows)
+            except BaseException:
+                action_quota.release(epoch, reserved)
+                raise
+        else:
+            on_rollback(self.session, partial(action_quota.release, epoch, dict(reserved)))
+            await self.session.execute(insert(models.Action), rows)
+        return results
+
+    def _build_rows(
+        self, tick: int, actions: Iterable[Dict[str, object]], received_at: datetime
+    ) -> Tuple[List[Dict[str, object]], Dict[uuid.UUID, int]]:
+        rows: List[Dict[str, object]] = []
+        requested: Dict[uuid.UUID, int] = defaultdict(int)
+        for index, action_payload in enumerate(actions):
             actor_id = uuid.UUID(str(action_payload["actor_id"]))
-            counts[actor_id] += 1
-            if counts[actor_id] > PER_TICK_ACTION_LIMIT:
+            requested[actor_id] += 1
+            if requested[actor_id] > action_quota.limit:
                 raise ValidationError("Action quota exceeded")
-            action = models.Action(
-                tick=tick,
-                actor_id=actor_id,
-                type=str(action_payload["type"]),
-                payload=dict(action_payload.get("payload", {})),
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "tick": tick,
+                    "actor_id": actor_id,
+                    "type": str(action_payload["type"]),
+                    "payload": dict(action_payload.get("payload", {})),
+                    # Explicit offsets keep submission order stable within a batch.
+                    "received_at": received_at + timedelta(microseconds=index),
+                }
             )
-            self.session.add(action)
-            accepted.append(action)
-        await self.session.flush()
-        return accepted
+        return rows, requested
+
+    async def validate_actions(self, *, tick: int, rows: List[Dict[str, object]]) -> None:
+        table = registry.registry.table()
+        context = table.context(self.session, tick)
+        for row in rows:
+            entry = table.get(str(row["type"]))
+            if entry is None:
+                raise ValidationError(f"Unknown action type: {row['type']}")
+            await entry.validator(context.bind(SimpleNamespace(**row)), row["payload"])
+
+    async def queued_counts(self, tick: int) -> Dict[uuid.UUID, int]:
+        if get_settings().action_intake == "log":
+            counts: Dict[uuid.UUID, int] = defaultdict(int)
+            for record in get_intake_log().drain(tick):
+                counts[record["actor_id"]] += 1
+            return counts
+        stmt = (
+            select(models.Action.actor_id, func.count())
+            .where(models.Action.tick == tick)
+            .group_by(models.Action.actor_id)
+        )
+        result = await self.session.execute(stmt)
+        return {actor_id: int(count) for actor_id, count in result.tuples()}
 
     async def actions_for_tick(self, tick: int) -> List[models.Action]:
         stmt = (
             select(models.Action)
             .where(models.Action.tick == tick)
-            .order_by(models.Action.received_at)
+            .order_by(models.Action.received_at, models.Action.id)
         )
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
-    async def apply_actions(self, *, tick: int) -> List[Dict[str, object]]:
-        actions = await self.actions_for_tick(tick)
+    async def queued_actions(self, tick: int) -> List[models.Action]:
+        if get_settings().action_intake == "log":
+            # Log intake never touches the action table; build transient rows.
+            return [models.Action(**record) for record in get_intake_log().drain(tick)]
+        return await self.actions_for_tick(tick)
+
+    async def apply_actions(self, *, tick: int, seed: int = 0) -> List[Dict[str, object]]:
+        self._table = registry.registry.table()
+        self._seed = seed
+        actions = await self.queued_actions(tick)
+        return await self._apply_serial(self.session, tick, actions)
+
+    async def _apply_serial(
+        self, session: AsyncSession, tick: int, actions: Sequence[models.Action]
+    ) -> List[Dict[str, object]]:
         applied: List[Dict[str, object]] = []
+        context = self._table.context(session, tick, self._seed)
+        profiler = current_profiler.get()
         for action in actions:
-            definition = registry.registry.get(action.type)
-            if definition is None:
+            entry = self._table.get(action.type)
+            if entry is None:
                 raise ValidationError(f"Unknown action type: {action.type}")
-            context = SimpleNamespace(session=self.session, tick=tick, action=action)
-            await definition.validator(context, action.payload)
-            result = await definition.applier(context, action.payload)
+            started = time.perf_counter()
+            context.bind(action)
+            try:
+                await entry.validator(context, action.payload)
+            except ValidationError as exc:
+                # Enqueue validated against older state; an earlier action this
+                # tick can invalidate it. Reject it rather than fail the tick.
+                result: object = {"rejected": str(exc)}
+            else:
+                result = await entry.applier(context, action.payload)
+            if profiler is not None:
+                profiler.record_action(action.type, time.perf_counter() - started)
             applied.append(
                 {
                     "id": str(action.id),
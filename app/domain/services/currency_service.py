@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import uuid
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.player_views import player_views, record_balance, record_player_changes
 from app.domain import models
 from app.domain.models import Denomination
 from app.domain.services.encryption_service import verify_packet_solution
@@ -18,6 +19,9 @@ DENOMINATION_MULTIPLIER = {
 }
 
 
+PACKET_COLUMNS = ("id", "denom", "encrypted", "payload")
+
+
 class CurrencyService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -28,7 +32,22 @@ class CurrencyService:
         balance = result.scalar_one()
         return int(balance)
 
-    async def transfer(self, sender_id: uuid.UUID, recipient_id: uuid.UUID, amount: int) -> None:
+    async def cached_balance(self, player_id: uuid.UUID) -> int:
+        """Committed balance, from the player view cache when it holds one."""
+
+        view = player_views.get(player_id)
+        if view is not None and view.balance is not None:
+            return view.balance
+        stamp = player_views.stamp()
+        balance = await self.get_balance(player_id)
+        player_views.fill(player_id, stamp, "balance", balance)
+        return balance
+
+    async def transfer(
+        self, sender_id: uuid.UUID, recipient_id: uuid.UUID, amount: int
+    ) -> int:
+        """Move ``amount`` between players; returns the sender's new balance."""
+
         if amount <= 0:
             raise ValueError("Transfer amount must be positive")
         sender = await self.session.get(models.Player, sender_id, with_for_update=True)
@@ -42,6 +61,9 @@ class CurrencyService:
         sender.balance_mamp -= amount
         recipient.balance_mamp += amount
         await self.session.flush()
+        record_balance(self.session, sender_id, sender.balance_mamp)
+        record_balance(self.session, recipient_id, recipient.balance_mamp)
+        return sender.balance_mamp
 
     async def adjust_balance(self, player_id: uuid.UUID, delta: int) -> int:
         player = await self.session.get(models.Player, player_id, with_for_update=True)
@@ -52,6 +74,7 @@ class CurrencyService:
             raise ValueError("Insufficient balance")
         player.balance_mamp = new_balance
         await self.session.flush()
+        record_balance(self.session, player_id, new_balance)
         return new_balance
 
     async def mint_encrypted_packet(
@@ -70,6 +93,7 @@ class CurrencyService:
         )
         self.session.add(packet)
         await self.session.flush()
+        record_player_changes(self.session, [owner_id], "packets")
         return packet
 
     async def list_packets(self, owner_id: uuid.UUID) -> List[models.CurrencyPacket]:
@@ -77,14 +101,36 @@ class CurrencyService:
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
+    async def packet_rows(self, owner_id: uuid.UUID) -> List[Tuple[Any, ...]]:
+        stmt = select(
+            models.CurrencyPacket.id,
+            models.CurrencyPacket.denom,
+            models.CurrencyPacket.encrypted,
+            models.CurrencyPacket.payload,
+        ).where(models.CurrencyPacket.owner_id == owner_id)
+        result = await self.session.execute(stmt)
+        return list(result.tuples())
+
+    async def cached_packet_rows(self, owner_id: uuid.UUID) -> List[Tuple[Any, ...]]:
+        view = player_views.get(owner_id)
+        if view is not None and view.packets is not None:
+            return view.packets
+        stamp = player_views.stamp()
+        rows = await self.packet_rows(owner_id)
+        player_views.fill(owner_id, stamp, "packets", rows)
+        return rows
+
     async def decrypt_packet(
         self, owner_id: uuid.UUID, packet_id: uuid.UUID, solution: Dict[str, object]
-    ) -> int:
+    ) -> Tuple[int, int]:
+        """Returns ``(reward, balance after the reward)``."""
+
         packet = await self.session.get(models.CurrencyPacket, packet_id, with_for_update=True)
         if packet is None or packet.owner_id != owner_id:
             raise ValueError("Packet not found")
         if not packet.encrypted:
-            return DENOMINATION_MULTIPLIER[packet.denom]
+            balance = await self.get_balance(owner_id)
+            return DENOMINATION_MULTIPLIER[packet.denom], balance
         reward = verify_packet_solution(packet.payload, solution)
         if reward is None:
             raise ValueError("Invalid solution")
@@ -96,7 +142,9 @@ class CurrencyService:
             raise ValueError("Player missing")
         player.balance_mamp += amount
         await self.session.flush()
-        return amount
+        record_player_changes(self.session, [owner_id], "packets")
+        record_balance(self.session, owner_id, player.balance_mamp)
+        return amount, player.balance_mamp
 
 
 async def denomination_to_mamp(denom: Denomination) -> int:
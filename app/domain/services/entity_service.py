@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core import events
+from app.core.http_cache import resource_versions
+from app.core.spatial import PositionChange, entity_grid, entity_point
+from app.domain import models
+from app.infra.db import on_commit, pending_until_commit
+
+
+def record_entity_positions(
+    session: AsyncSession, changes: Iterable[PositionChange]
+) -> None:
+    """Queue spatial index updates; they are applied once the session commits."""
+
+    pending_until_commit(session, "entity_positions", entity_grid.apply).extend(changes)
+
+
+@dataclass(frozen=True, slots=True)
+class EntityUpdate:
+    """A compare-and-swap write: the new ``pos``/``attrs`` land only if the row is
+    still at ``expected_version`` and owned by ``actor_id``."""
+
+    entity_id: uuid.UUID
+    expected_version: int
+    actor_id: uuid.UUID
+    pos: Optional[Dict[str, Any]]
+    attrs: Dict[str, Any]
+    # Sort key that fixes which update wins when several target one entity.
+    order: Tuple[Any, ...] = ()
+
+
+# Updates staged by the running tick's appliers; flushed together after matching.
+tick_entity_updates: ContextVar[Optional[List[EntityUpdate]]] = ContextVar(
+    "tick_entity_updates", default=None
+)
+
+
+def stage_entity_updates(updates: Iterable[EntityUpdate]) -> None:
+    staged = tick_entity_updates.get()
+    if staged is None:
+        raise ValueError("Entity updates can only be staged while a tick is applied")
+    staged.extend(updates)
+
+
+def entity_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_etag_version(header: str) -> Optional[int]:
+    """Version named by an ``If-Match``/``If-None-Match`` value, if it is ours."""
+
+    value = header.strip().removeprefix("W/").strip('"')
+    return int(value) if value.isdigit() else None
+
+
+class EntityService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    def _entities_changed(self) -> None:
+        on_commit(self.session, partial(resource_versions.bump, "entities"))
+
+    async def load_index(self) -> None:
+        result = await self.session.execute(
+            select(models.Entity.id, models.Entity.pos).where(
+                models.Entity.pos.is_not(None)
+            )
+        )
+        entity_grid.load(
+            (entity_id, point)
+            for entity_id, pos in result.tuples()
+            if (point := entity_point(pos)) is not None
+        )
+
+    async def create_entity(
+        self,
+        *,
+        type: str,
+        owner_id: Optional[uuid.UUID],
+        pos: Optional[Dict[str, Any]] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> models.Entity:
+        entity = models.Entity(type=type, owner_id=owner_id, pos=pos, attrs=attrs or {})
+        self.session.add(entity)
+        await self.session.flush()
+        record_entity_positions(self.session, [(entity.id, entity_point(pos))])
+        self._entities_changed()
+        return entity
+
+    async def move_entity(
+        self, *, entity_id: uuid.UUID, actor_id: uuid.UUID, pos: Dict[str, Any]
+    ) -> models.Entity:
+        entity = await self.session.get(models.Entity, entity_id, with_for_update=True)
+        if entity is None:
+            raise ValueError("Entity not found")
+        if entity.owner_id != actor_id:
+            raise ValueError("Only owner can move entity")
+        entity.pos = dict(pos)
+        entity.version += 1
+        await self.session.flush()
+        record_entity_positions(self.session, [(entity.id, entity_point(entity.pos))])
+        self._entities_changed()
+        return entity
+
+    async def prepare_updates(
+        self,
+        *,
+        actor_id: uuid.UUID,
+        requested: Sequence[Dict[str, Any]],
+        order: Tuple[Any, ...] = (),
+    ) -> List[EntityUpdate]:
+        """Turn ``{entity_id, version, pos?, attrs?}`` requests into full updates.
+
+        Fields a request leaves out keep their current value; if the row changes
+        before the update is applied its version moves on and the swap fails.
+        """
+
+        ids = [uuid.UUID(str(entry["entity_id"])) for entry in requested]
+        result = await self.session.execute(
+            select(models.Entity.id, models.Entity.pos, models.Entity.attrs).where(
+                models.Entity.id.in_(ids)
+            )
+        )
+        current = {entity_id: (pos, attrs) for entity_id, pos, attrs in result.tuples()}
+        updates: List[EntityUpdate] = []
+        for index, (entity_id, entry) in enumerate(zip(ids, requested, strict=True)):
+            pos, attrs = current.get(entity_id, (None, {}))
+            updates.append(
+                EntityUpdate(
+                    entity_id=entity_id,
+                    expected_version=int(entry["version"]),
+                    actor_id=actor_id,
+                    pos=entry["pos"] if "pos" in entry else pos,
+                    attrs=dict(entry["attrs"]) if "attrs" in entry else attrs,
+                    order=(*order, index),
+                )
+            )
+        return updates
+
+    async def apply_updates(
+        self, *, tick: int, updates: Sequence[EntityUpdate]
+    ) -> Tuple[List[Tuple[EntityUpdate, int]], List[EntityUpdate]]:
+        """Apply ``updates`` as one compare-and-swap statement.
+
+        Returns ``(applied, conflicts)``; ``applied`` pairs each update with the
+        entity's new version. Only the first update per entity (by ``order``) can
+        win, later ones for the same entity are conflicts by construction.
+        """
+
+        winners: List[EntityUpdate] = []
+        conflicts: List[EntityUpdate] = []
+        seen = set()
+        for entry in sorted(updates, key=lambda entry: entry.order):
+            (conflicts if entry.entity_id in seen else winners).append(entry)
+            seen.add(entry.entity_id)
+        if not winners:
+            return [], conflicts
+
+        entity = models.Entity.__table__
+        params = [
+            {
+                "entity_key": entry.entity_id,
+                "expected": entry.expected_version,
+                "owner": entry.actor_id,
+                "new_pos": entry.pos,
+                "new_attrs": entry.attrs,
+            }
+            for entry in winners
+        ]
+        result = await self.session.execute(
+            update(entity)
+            .where(
+                entity.c.id == bindparam("entity_key"),
+                entity.c.version == bindparam("expected"),
+                entity.c.owner_id == bindparam("owner"),
+            )
+            .values(
+                pos=bindparam("new_pos", type_=entity.c.pos.type),
+                attrs=bindparam("new_attrs", type_=entity.c.attrs.type),
+                version=entity.c.version + 1,
+            ),
+            params if len(params) > 1 else params[0],
+        )
+        dialect = self.session.get_bind().dialect
+        if result.rowcount == len(params) and (
+            len(params) == 1 or dialect.supports_sane_multi_rowcount
+        ):
+            applied = [(entry, entry.expected_version + 1) for entry in winners]
+        elif len(params) == 1:
+            applied, conflicts = [], conflicts + winners
+        else:
+            # Some swaps missed: read the rows back to tell which ones landed. A
+            # row counts as ours only if it holds exactly what this update wrote.
+            readback = await self.session.execute(
+                select(
+                    entity.c.id, entity.c.version, entity.c.pos, entity.c.attrs
+                ).where(entity.c.id.in_([entry.entity_id for entry in winners]))
+            )
+            rows = {row[0]: row[1:] for row in readback.tuples()}
+            applied = []
+            for entry in winners:
+                wanted = (entry.expected_version + 1, entry.pos, entry.attrs)
+                if rows.get(entry.entity_id) == wanted:
+                    applied.append((entry, entry.expected_version + 1))
+                else:
+                    conflicts.append(entry)
+
+        # Keep entities already in the session in step with the batched update.
+        sync = self.session.sync_session
+        for entry, version in applied:
+            key = sync.identity_key(models.Entity, entry.entity_id)
+            loaded = sync.identity_map.get(key)
+            if loaded is not None:
+                set_committed_value(loaded, "pos", entry.pos)
+                set_committed_value(loaded, "attrs", entry.attrs)
+                set_committed_value(loaded, "version", version)
+
+        await events.bulk_events(
+            self.session,
+            tick=tick,
+            events=[
+                *(
+                    ("entity.updated", entry.entity_id, {"version": version})
+                    for entry, version in applied
+                ),
+                *(
+                    (
+                        "entity.conflict",
+                        entry.entity_id,
+                        {
+                            "actor_id": str(entry.actor_id),
+                            "expected_version": entry.expected_version,
+                        },
+                    )
+                    for entry in conflicts
+                ),
+            ],
+        )
+        if applied:
+            record_entity_positions(
+                self.session,
+                [(entry.entity_id, entity_point(entry.pos)) for entry, _ in applied],
+            )
+            self._entities_changed()
+        return applied, conflicts
@@ -1,14 +1,45 @@
 from __future__ import annotations
 
 import uuid
-from typing import Dict, List, Optional
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.http_cache import resource_versions
+from app.core.market_history import Trade, market_history
+from app.core.order_book import BookChange, order_book
+from app.core.player_views import player_views, record_player_changes
 from app.domain import models
 from app.domain.models import MarketListing, MarketStatus
 from app.domain.services.currency_service import CurrencyService
+from app.infra.db import on_commit, pending_until_commit
+
+
+LISTING_COLUMNS = (
+    "id",
+    "seller_id",
+    "item_type",
+    "item_attrs",
+    "price_amp",
+    "status",
+    "created_tick",
+    "filled_tick",
+)
+
+
+def record_trades(session: AsyncSession, trades: Iterable[Trade]) -> None:
+    """Queue trades for the price history; they are ingested once the session commits."""
+
+    pending_until_commit(session, "market_trades", market_history.ingest).extend(trades)
+
+
+def record_book_changes(session: AsyncSession, changes: Iterable[BookChange]) -> None:
+    """Queue order book changes; they are staged for the next delta once committed."""
+
+    pending_until_commit(session, "book_changes", order_book.stage).extend(changes)
 
 
 class MarketService:
@@ -16,6 +47,10 @@ class MarketService:
         self.session = session
         self.currency = CurrencyService(session)
 
+    def _listings_changed(self, seller_id: uuid.UUID) -> None:
+        on_commit(self.session, partial(resource_versions.bump, "market"))
+        record_player_changes(self.session, [seller_id], "listings")
+
     async def create_listing(
         self,
         *,
@@ -24,6 +59,7 @@ class MarketService:
         item_attrs: Dict[str, object],
         price_amp: int,
         tick: int,
+        placed_at: Optional[datetime] = None,
     ) -> MarketListing:
         listing = MarketListing(
             seller_id=seller_id,
@@ -33,28 +69,92 @@ class MarketService:
             status=MarketStatus.open,
             created_tick=tick,
         )
+        if placed_at is not None:
+            # Time priority in the matching engine follows action submission order.
+            listing.created_at = placed_at
         self.session.add(listing)
         await self.session.flush()
+        self._listings_changed(seller_id)
+        record_book_changes(
+            self.session, [("added", item_type, str(listing.id), int(price_amp))]
+        )
         return listing
 
-    async def list_listings(
+    def _filter_listings(
         self,
+        stmt: Select,
         *,
-        status: Optional[MarketStatus] = None,
-        seller_id: Optional[uuid.UUID] = None,
-        item_type: Optional[str] = None,
-    ) -> List[MarketListing]:
-        stmt = select(MarketListing)
+        status: Optional[MarketStatus],
+        seller_id: Optional[uuid.UUID],
+        item_type: Optional[str],
+    ) -> Select:
         if status is not None:
             stmt = stmt.where(MarketListing.status == status)
         if seller_id is not None:
             stmt = stmt.where(MarketListing.seller_id == seller_id)
         if item_type is not None:
             stmt = stmt.where(MarketListing.item_type == item_type)
-        stmt = stmt.order_by(MarketListing.created_tick)
+        return stmt.order_by(MarketListing.created_tick)
+
+    async def list_listings(
+        self,
+        *,
+        status: Optional[MarketStatus] = None,
+        seller_id: Optional[uuid.UUID] = None,
+        item_type: Optional[str] = None,
+    ) -> List[MarketListing]:
+        stmt = self._filter_listings(
+            select(MarketListing), status=status, seller_id=seller_id, item_type=item_type
+        )
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
+    async def listing_rows(
+        self,
+        *,
+        status: Optional[MarketStatus] = None,
+        seller_id: Optional[uuid.UUID] = None,
+        item_type: Optional[str] = None,
+    ) -> List[Tuple[Any, ...]]:
+        columns = [
+            MarketListing.id,
+            MarketListing.seller_id,
+            MarketListing.item_type,
+            MarketListing.item_attrs,
+            MarketListing.price_amp_bigint,
+            MarketListing.status,
+            MarketListing.created_tick,
+            MarketListing.filled_tick,
+        ]
+        stmt = self._filter_listings(
+            select(*columns), status=status, seller_id=seller_id, item_type=item_type
+        )
+        result = await self.session.execute(stmt)
+        return list(result.tuples())
+
+    async def seller_listing_rows(
+        self,
+        seller_id: uuid.UUID,
+        *,
+        status: Optional[MarketStatus] = None,
+        item_type: Optional[str] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """``listing_rows`` for one seller, served from the player view cache."""
+
+        view = player_views.get(seller_id)
+        rows = view.listings if view is not None else None
+        if rows is None:
+            stamp = player_views.stamp()
+            rows = await self.listing_rows(seller_id=seller_id)
+            player_views.fill(seller_id, stamp, "listings", rows)
+        column = LISTING_COLUMNS.index
+        return [
+            row
+            for row in rows
+            if (status is None or row[column("status")] == status)
+            and (item_type is None or row[column("item_type")] == item_type)
+        ]
+
     async def buy_listing(self, *, listing_id: uuid.UUID, buyer_id: uuid.UUID, tick: int) -> MarketListing:
         listing = await self.session.get(MarketListing, listing_id, with_for_update=True)
         if listing is None:
@@ -67,6 +167,12 @@ class MarketService:
         listing.status = MarketStatus.filled
         listing.filled_tick = tick
         await self.session.flush()
+        self._listings_changed(listing.seller_id)
+        price = int(listing.price_amp_bigint)
+        record_trades(self.session, [(listing.item_type, tick, price)])
+        record_book_changes(
+            self.session, [("filled", listing.item_type, str(listing.id), price)]
+        )
         return listing
 
     async def cancel_listing(self, *, listing_id: uuid.UUID, actor_id: uuid.UUID, tick: int) -> MarketListing:
@@ -80,4 +186,60 @@ class MarketService:
         listing.status = MarketStatus.cancelled
         listing.filled_tick = tick
         await self.session.flush()
+        self._listings_changed(actor_id)
+        record_book_changes(
+            self.session,
+            [
+                (
+                    "cancelled",
+                    listing.item_type,
+                    str(listing.id),
+                    int(listing.price_amp_bigint),
+                )
+            ],
+        )
         return listing
+
+    async def load_history(self) -> None:
+        """Rebuild the in-memory price history from filled listings."""
+
+        latest = await self.session.scalar(
+            select(func.max(MarketListing.filled_tick)).where(
+                MarketListing.status == MarketStatus.filled
+            )
+        )
+        market_history.clear()
+        if latest is None:
+            return
+        horizon = max(market_history.intervals) * market_history.capacity
+        stmt = (
+            select(
+                MarketListing.item_type,
+                MarketListing.filled_tick,
+                MarketListing.price_amp_bigint,
+            )
+            .where(
+                MarketListing.status == MarketStatus.filled,
+                MarketListing.filled_tick > latest - horizon,
+            )
+            .order_by(MarketListing.filled_tick, MarketListing.id)
+        )
+        result = await self.session.execute(stmt)
+        market_history.ingest(
+            (item_type, int(tick), int(price)) for item_type, tick, price in result.tuples()
+        )
+
+    async def load_book(self, tick: int) -> None:
+        """Rebuild the in-memory order book from open listings."""
+
+        stmt = select(
+            MarketListing.item_type, MarketListing.id, MarketListing.price_amp_bigint
+        ).where(MarketListing.status == MarketStatus.open)
+        result = await self.session.execute(stmt)
+        order_book.load(
+            (
+                (item_type, str(listing_id), int(price))
+                for item_type, listing_id, price in result
+            ),
+            tick,
+        )
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import itertools
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Sequence
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core import events
+from app.core.http_cache import resource_versions
+from app.core.player_views import record_balance, record_player_changes
+from app.domain import models
+from app.domain.models import MarketBid, MarketListing, MarketStatus
+from app.domain.services.currency_service import CurrencyService
+from app.domain.services.market_service import record_book_changes, record_trades
+from app.infra.db import on_commit
+
+
+@dataclass(frozen=True, slots=True)
+class Fill:
+    bid_id: uuid.UUID
+    listing_id: uuid.UUID
+    buyer_id: uuid.UUID
+    seller_id: uuid.UUID
+    item_type: str
+    price_amp: int
+    refund_mamp: int
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            key: str(value) if isinstance(value, uuid.UUID) else value
+            for key, value in asdict(self).items()
+        }
+
+
+def match_book(bids: Sequence[MarketBid], asks: Sequence[MarketListing]) -> List[Fill]:
+    """Match one item type's book with price-time priority.
+
+    ``bids`` must be ordered best first (highest price, then earliest) and ``asks``
+    likewise (lowest price, then earliest). Each listing fills at most one bid, at
+    the listing's price; a bid never matches a listing from its own bidder.
+    """
+
+    fills: List[Fill] = []
+    taken = [False] * len(asks)
+    start = 0
+    for bid in bids:
+        while start < len(asks) and taken[start]:
+            start += 1
+        for index in range(start, len(asks)):
+            ask = asks[index]
+            if ask.price_amp_bigint > bid.price_amp_bigint:
+                break
+            if taken[index] or ask.seller_id == bid.bidder_id:
+                continue
+            taken[index] = True
+            price = int(ask.price_amp_bigint)
+            fills.append(
+                Fill(
+                    bid_id=bid.id,
+                    listing_id=ask.id,
+                    buyer_id=bid.bidder_id,
+                    seller_id=ask.seller_id,
+                    item_type=bid.item_type,
+                    price_amp=price,
+                    refund_mamp=int(bid.escrow_mamp) - price,
+                )
+            )
+            break
+    return fills
+
+
+class MatchingEngine:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.currency = CurrencyService(session)
+
+    async def place_bid(
+        self,
+        *,
+        bidder_id: uuid.UUID,
+        item_type: str,
+        price_amp: int,
+        tick: int,
+        placed_at: datetime,
+    ) -> MarketBid:
+        # The full limit price is escrowed; any surplus is refunded on fill.
+        await self.currency.adjust_balance(bidder_id, -price_amp)
+        bid = MarketBid(
+            bidder_id=bidder_id,
+            item_type=item_type,
+            price_amp_bigint=price_amp,
+            escrow_mamp=price_amp,
+            status=MarketStatus.open,
+            created_tick=tick,
+            placed_at=placed_at,
+        )
+        self.session.add(bid)
+        await self.session.flush()
+        return bid
+
+    async def cancel_bid(
+        self, *, bid_id: uuid.UUID, actor_id: uuid.UUID, tick: int
+    ) -> MarketBid:
+        bid = await self.session.get(MarketBid, bid_id, with_for_update=True)
+        if bid is None:
+            raise ValueError("Bid not found")
+        if bid.bidder_id != actor_id:
+            raise ValueError("Only bidder can cancel bid")
+        if bid.status != MarketStatus.open:
+            raise ValueError("Bid not open")
+        await self.currency.adjust_balance(actor_id, int(bid.escrow_mamp))
+        bid.status = MarketStatus.cancelled
+        bid.filled_tick = tick
+        await self.session.flush()
+        return bid
+
+    async def release_open_bids(self) -> None:
+        """Refund the escrow of every open bid, e.g. before the bids are deleted."""
+
+        result = await self.session.execute(
+            select(MarketBid.bidder_id, func.sum(MarketBid.escrow_mamp))
+            .where(MarketBid.status == MarketStatus.open)
+            .group_by(MarketBid.bidder_id)
+        )
+        params = [
+            {"player_key": bidder_id, "refund": int(escrow)}
+            for bidder_id, escrow in sorted(result.tuples())
+        ]
+        if not params:
+            return
+        player = models.Player.__table__
+        await self.session.execute(
+            update(player)
+            .where(player.c.id == bindparam("player_key"))
+            .values(balance_mamp=player.c.balance_mamp + bindparam("refund")),
+            params,
+        )
+        for row in params:
+            record_balance(self.session, row["player_key"], None)
+
+    async def match(self, *, tick: int) -> List[Fill]:
+        bid_stmt = (
+            select(MarketBid)
+            .where(MarketBid.status == MarketStatus.open)
+            .order_by(
+                MarketBid.item_type,
+                MarketBid.price_amp_bigint.desc(),
+                MarketBid.created_tick,
+                MarketBid.placed_at,
+                MarketBid.id,
+            )
+        )
+        bids = list((await self.session.execute(bid_stmt)).scalars())
+        if not bids:
+            return []
+        bids_by_type = {
+            item_type: list(group)
+            for item_type, group in itertools.groupby(bids, key=lambda bid: bid.item_type)
+        }
+        ask_stmt = (
+            select(MarketListing)
+            .where(
+                MarketListing.status == MarketStatus.open,
+                MarketListing.item_type.in_(bids_by_type),
+            )
+            .order_by(
+                MarketListing.item_type,
+                MarketListing.price_amp_bigint,
+                MarketListing.created_tick,
+                MarketListing.created_at,
+                MarketListing.id,
+            )
+        )
+        asks = list((await self.session.execute(ask_stmt)).scalars())
+        asks_by_type = {
+            item_type: list(group)
+            for item_type, group in itertools.groupby(asks, key=lambda ask: ask.item_type)
+        }
+
+        fills: List[Fill] = []
+        for item_type in sorted(bids_by_type):
+            fills.extend(match_book(bids_by_type[item_type], asks_by_type.get(item_type, [])))
+        if fills:
+            await self._settle(
+                tick,
+                fills,
+                {bid.id: bid for bid in bids},
+                {ask.id: ask for ask in asks},
+            )
+        return fills
+
+    async def _settle(
+        self,
+        tick: int,
+        fills: List[Fill],
+        bids: Dict[uuid.UUID, MarketBid],
+        asks: Dict[uuid.UUID, MarketListing],
+    ) -> None:
+        credits: Dict[uuid.UUID, int] = defaultdict(int)
+        for fill in fills:
+            bid = bids[fill.bid_id]
+            bid.status = MarketStatus.filled
+            bid.filled_tick = tick
+            bid.fill_price_amp = fill.price_amp
+            bid.listing_id = fill.listing_id
+            listing = asks[fill.listing_id]
+            listing.status = MarketStatus.filled
+            listing.filled_tick = tick
+            credits[fill.seller_id] += fill.price_amp
+            credits[fill.buyer_id] += fill.refund_mamp
+        await self.session.flush()
+
+        # One executemany for every balance touched by the tick's fills.
+        player = models.Player.__table__
+        params = [
+            {"player_key": player_id, "credit": amount}
+            for player_id, amount in sorted(credits.items())
+            if amount
+        ]
+        if params:
+            await self.session.execute(
+                update(player)
+                .where(player.c.id == bindparam("player_key"))
+                .values(balance_mamp=player.c.balance_mamp + bindparam("credit")),
+                params,
+            )
+        # Keep players already in the session in step with the batched update.
+        for row in params:
+            loaded = self.session.sync_session.identity_map.get(
+                self.session.sync_session.identity_key(models.Player, row["player_key"])
+            )
+            if loaded is not None:
+                set_committed_value(
+                    loaded, "balance_mamp", loaded.balance_mamp + row["credit"]
+                )
+            record_balance(
+                self.session,
+                row["player_key"],
+                loaded.balance_mamp if loaded is not None else None,
+            )
+        record_player_changes(
+            self.session, {fill.seller_id for fill in fills}, "listings"
+        )
+
+        await events.bulk_events(
+            self.session,
+            tick=tick,
+            events=[
+                (
+                    "market.listing_filled",
+                    fill.listing_id,
+                    {
+                        "buyer_id": str(fill.buyer_id),
+                        "bid_id": str(fill.bid_id),
+                        "price_amp": fill.price_amp,
+                    },
+                )
+                for fill in fills
+            ],
+        )
+        record_trades(
+            self.session, [(fill.item_type, tick, fill.price_amp) for fill in fills]
+        )
+        record_book_changes(
+            self.session,
+            [
+                ("filled", fill.item_type, str(fill.listing_id), fill.price_amp)
+                for fill in fills
+            ],
+        )
+        on_commit(self.session, partial(resource_versions.bump, "market"))
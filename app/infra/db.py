@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from functools import partial
+from typing import Any, AsyncIterator, Callable, List
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.profiling import instrument_engine
 from app.domain.models import Base
 
 _engine: AsyncEngine | None = None
@@ -27,9 +34,38 @@ def get_engine() -> AsyncEngine:
             else settings.database_url
         )
         _engine = create_async_engine(database_url, echo=False, future=True)
+        instrument_engine(_engine.sync_engine)
+        _instrument_pool_and_queries(_engine.sync_engine)
     return _engine
 
 
+db_pool_checkouts_total = metrics.counter(
+    "cb_db_pool_checkouts_total", "Connections checked out of the pool."
+)
+db_pool_in_use = metrics.gauge("cb_db_pool_in_use", "Connections currently checked out.")
+db_query_seconds = metrics.histogram("cb_db_query_seconds", "Statement execution latency.")
+
+
+def _instrument_pool_and_queries(engine: Engine) -> None:
+    @event.listens_for(engine.pool, "checkout")
+    def _checkout(*_: Any) -> None:
+        db_pool_checkouts_total.inc()
+        db_pool_in_use.inc()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _checkin(*_: Any) -> None:
+        db_pool_in_use.dec()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn: Any, *_: Any) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn: Any, *_: Any) -> None:
+        started = conn.info["query_started"].pop()
+        db_query_seconds.observe(time.perf_counter() - started)
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     global _session_factory
     if _session_factory is None:
@@ -39,6 +75,46 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _session_factory
 
 
+def on_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's current transaction commits."""
+
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+def on_rollback(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` if the session's current transaction rolls back."""
+
+    session.info.setdefault("on_rollback", []).append(callback)
+
+
+def pending_until_commit(
+    session: AsyncSession, key: str, sink: Callable[[List[Any]], None]
+) -> List[Any]:
+    """One list per transaction, handed to ``sink`` only if the transaction commits."""
+
+    pending = session.info.get(key)
+    if pending is None:
+        pending = session.info[key] = []
+        on_commit(session, partial(session.info.pop, key, None))
+        on_commit(session, partial(sink, pending))
+        on_rollback(session, partial(session.info.pop, key, None))
+    return pending
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(session: Session) -> None:
+    session.info.pop("on_rollback", None)
+    for callback in session.info.pop("on_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _run_rollback_callbacks(session: Session) -> None:
+    session.info.pop("on_commit", None)
+    for callback in session.info.pop("on_rollback", []):
+        callback()
+
+
 @asynccontextmanager
 async def lifespan_session() -> AsyncIterator[AsyncSession]:
     session = get_session_factory()()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+
+import orjson
+
+from app.core.config import get_settings
+
+
+class IntakeLog:
+    """Append-only, fsync-batched action log with one segment file per tick.
+
+    Appends made within ``fsync_interval`` seconds of each other share a single
+    flush + fsync; ``append`` returns once its records are durable.
+    """
+
+    def __init__(self, directory: str, fsync_interval: float) -> None:
+        self.directory = Path(directory)
+        self.fsync_interval = fsync_interval
+        self._files: Dict[int, BinaryIO] = {}
+        self._dirty: Set[int] = set()
+        self._batch: Optional[asyncio.Future[None]] = None
+
+    def _segment(self, tick: int) -> Path:
+        return self.directory / f"tick-{tick:012d}.log"
+
+    def _file(self, tick: int) -> BinaryIO:
+        handle = self._files.get(tick)
+        if handle is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            handle = self._files[tick] = open(self._segment(tick), "ab")
+        return handle
+
+    async def append(self, tick: int, records: List[Dict[str, Any]]) -> None:
+        self._file(tick).write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+        self._dirty.add(tick)
+        if self._batch is None:
+            loop = asyncio.get_running_loop()
+            self._batch = loop.create_future()
+            loop.call_later(self.fsync_interval, self._start_flush)
+        await asyncio.shield(self._batch)
+
+    def _start_flush(self) -> None:
+        batch, self._batch = self._batch, None
+        handles = [self._files[tick] for tick in self._dirty if tick in self._files]
+        self._dirty.clear()
+        task = asyncio.ensure_future(asyncio.to_thread(_sync_files, handles))
+
+        def _done(finished: asyncio.Future[None]) -> None:
+            if batch is None or batch.done():
+                return
+            if finished.exception() is not None:
+                batch.set_exception(finished.exception())  # type: ignore[arg-type]
+            else:
+                batch.set_result(None)
+
+        task.add_done_callback(_done)
+
+    def drain(self, tick: int) -> List[Dict[str, Any]]:
+        handle = self._files.get(tick)
+        if handle is not None:
+            handle.flush()
+        path = self._segment(tick)
+        if not path.exists():
+            return []
+        records = []
+        for line in path.read_bytes().splitlines():
+            if not line:
+                continue
+            record = orjson.loads(line)
+            record["id"] = uuid.UUID(record["id"])
+            record["actor_id"] = uuid.UUID(record["actor_id"])
+            record["received_at"] = datetime.fromisoformat(record["received_at"])
+            records.append(record)
+        records.sort(key=lambda record: (record["received_at"], str(record["id"])))
+        return records
+
+    def discard_through(self, tick: int) -> None:
+        for open_tick in [open_tick for open_tick in self._files if open_tick <= tick]:
+            self._files.pop(open_tick).close()
+            self._dirty.discard(open_tick)
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("tick-*.log"):
+            if int(path.stem.removeprefix("tick-")) <= tick:
+                path.unlink(missing_ok=True)
+
+
+def _sync_files(handles: List[BinaryIO]) -> None:
+    for handle in handles:
+        if handle.closed:
+            continue
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+_intake_log: IntakeLog | None = None
+
+
+def get_intake_log() -> IntakeLog:
+    global _intake_log
+    if _intake_log is None:
+        settings = get_settings()
+        _intake_log = IntakeLog(
+            settings.intake_log_dir, settings.intake_fsync_interval_ms / 1000
+        )
+    return _intake_log
@@ -0,0 +1,36 @@
+"""market bids for the matching engine"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_market_bid"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_bid",
+        sa.Column("id", sa.dialects.postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("bidder_id", sa.dialects.postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("item_type", sa.String(length=64), nullable=False),
+        sa.Column("price_amp_bigint", sa.BigInteger(), nullable=False),
+        sa.Column("escrow_mamp", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("created_tick", sa.Integer, nullable=False),
+        sa.Column("placed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("filled_tick", sa.Integer, nullable=True),
+        sa.Column("fill_price_amp", sa.BigInteger(), nullable=True),
+        sa.Column("listing_id", sa.dialects.postgresql.UUID(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(["bidder_id"], ["player.id"]),
+        sa.ForeignKeyConstraint(["listing_id"], ["market_listing.id"]),
+    )
+    op.create_index("ix_market_bid_item_type", "market_bid", ["item_type"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_bid_item_type", table_name="market_bid")
+    op.drop_table("market_bid")
@@ -0,0 +1,23 @@
+"""per-tick event sequence for stream resume cursors"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_event_seq"
+down_revision = "0002_market_bid"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "event", sa.Column("seq", sa.Integer, nullable=False, server_default="0")
+    )
+    op.create_index("ix_event_tick_seq", "event", ["tick", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_tick_seq", table_name="event")
+    op.drop_column("event", "seq")
@@ -0,0 +1,33 @@
+"""unique (tick, seq) so resume cursors name exactly one event"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0004_event_seq_unique"
+down_revision = "0003_event_seq"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows written before seq existed all share seq 0; number them per tick.
+    op.execute(
+        """
+        UPDATE event SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY tick ORDER BY seq, created_at, id
+            ) AS seq
+            FROM event
+        ) AS numbered
+        WHERE event.id = numbered.id AND event.seq <> numbered.seq
+        """
+    )
+    op.drop_index("ix_event_tick_seq", table_name="event")
+    op.create_index("ix_event_tick_seq", "event", ["tick", "seq"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_tick_seq", table_name="event")
+    op.create_index("ix_event_tick_seq", "event", ["tick", "seq"])
@@ -3,17 +3,34 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List
 
+from app.core.metrics import metrics
+
+pubsub_published_total = metrics.counter(
+    "cb_pubsub_published_total", "Messages published per channel.", ["channel"]
+)
+pubsub_subscribers = metrics.gauge(
+    "cb_pubsub_subscribers", "Current subscribers per channel.", ["channel"]
+)
+
 
 @dataclass
 class InMemoryPubSub:
     subscribers: Dict[str, List[Callable[[Any], None]]] = field(default_factory=dict)
 
     def publish(self, channel: str, message: Any) -> None:
+        pubsub_published_total.inc(channel=channel)
         for callback in self.subscribers.get(channel, []):
             callback(message)
 
     def subscribe(self, channel: str, callback: Callable[[Any], None]) -> None:
         self.subscribers.setdefault(channel, []).append(callback)
+        pubsub_subscribers.set(len(self.subscribers[channel]), channel=channel)
+
+    def unsubscribe(self, channel: str, callback: Callable[[Any], None]) -> None:
+        callbacks = self.subscribers.get(channel, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        pubsub_subscribers.set(len(callbacks), channel=channel)
 
 
 pubsub = InMemoryPubSub()
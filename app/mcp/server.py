@@ -1,31 +1,185 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Any, Awaitable, Callable, Dict
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Union
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.action_batcher import get_action_batcher
+from app.core.auth import player_for_token, websocket_player_id
+from app.core.events import Cursor
+from app.core.logging import get_logger
+from app.core.order_book import order_book
 from app.core.ticks import TickManager
+from app.core.topics import ALL_TOPIC, Subscription, event_index, resolve_topics
+from app.core.wire import EncodedEvent, QueuedFrame, WireFormat, accept, tick_frames
+from app.core.world_cache import world_cache
 from app.domain.models import MarketStatus
+from app.domain.rules.base_ruleset import ValidationError
+from app.domain.services.currency_service import CurrencyService
 from app.domain.services.market_service import MarketService
 from app.infra.db import lifespan_session
 
 app = FastAPI(title="Circuit Breakers MCP")
+logger = get_logger("app.mcp")
 
+# Tool calls in flight per socket; the reader stops taking requests beyond this.
+MAX_IN_FLIGHT = 32
+MAX_BATCH = 100
+# Database sessions open at once per socket, so one client cannot drain the pool.
+MAX_DB_SESSIONS = 4
 
-ToolHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# Market tools that are plain tick actions; their params are the action payload.
+MARKET_ACTION_TOOLS = (
+    "list_item",
+    "buy_item",
+    "cancel_listing",
+    "place_ask",
+    "place_bid",
+    "cancel_bid",
+)
 
 
-async def handle_get_world_state(_: Dict[str, Any]) -> Dict[str, Any]:
-    async with lifespan_session() as session:
-        manager = TickManager(session)
-        world = await manager.get_world_state()
-        return {"tick": world.tick, "seed": world.seed, "ruleset_version": world.ruleset_version}
+ToolHandler = Callable[[Dict[str, Any], "McpConnection"], Awaitable[Dict[str, Any]]]
 
 
-async def handle_list_market_listings(params: Dict[str, Any]) -> Dict[str, Any]:
-    async with lifespan_session() as session:
+class McpConnection:
+    """One MCP socket: concurrent tool calls, a single writer and an event feed.
+
+    Requests are ``{"id": ..., "tool": ..., "params": {...}}`` objects, or a list
+    of them as a batch. Each request runs as its own task, so responses to
+    pipelined requests can arrive out of order and are matched by ``id``; a batch
+    is answered with one list in request order. Subscribed events are pushed on
+    the same socket as ``{"events": [...]}`` frames, one per tick.
+    """
+
+    def __init__(self, websocket: WebSocket, wire: WireFormat) -> None:
+        self.websocket = websocket
+        self.wire = wire
+        self.player_id: Optional[uuid.UUID] = None
+        self.subscription: Optional[Subscription] = None
+        self._queue: asyncio.Queue[QueuedFrame] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self._db_slots = asyncio.Semaphore(MAX_DB_SESSIONS)
+        self._calls: Set[asyncio.Task[None]] = set()
+
+    def push(
+        self, data: Union[EncodedEvent, bytes], cursor: Optional[Cursor] = None
+    ) -> None:
+        self._queue.put_nowait((data, cursor))
+
+    def reply(self, message: Any) -> None:
+        self.push(self.wire.encode(message))
+
+    async def write(self) -> None:
+        try:
+            while True:
+                items = [await self._queue.get()]
+                while not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                for frame in tick_frames(self.wire, items, None):
+                    await self.wire.send(self.websocket, frame)
+        except WebSocketDisconnect:
+            return
+
+    async def submit(self, request: Any) -> None:
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run(request))
+        self._calls.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task[None]) -> None:
+        self._calls.discard(task)
+        self._slots.release()
+
+    async def _run(self, request: Any) -> None:
+        if isinstance(request, list):
+            if len(request) > MAX_BATCH:
+                self.reply({"error": f"batch larger than {MAX_BATCH}"})
+                return
+            self.reply(list(await asyncio.gather(*(self.call(r) for r in request))))
+        else:
+            self.reply(await self.call(request))
+
+    async def call(self, request: Any) -> Dict[str, Any]:
+        if not isinstance(request, dict):
+            return {"error": "request must be an object"}
+        response: Dict[str, Any] = {}
+        if "id" in request:
+            response["id"] = request["id"]
+        tool = request.get("tool")
+        handler = tool_map.get(tool)
+        if handler is None:
+            response["error"] = f"unknown tool {tool}"
+            return response
+        try:
+            result = await handler(request.get("params") or {}, self)
+        except (ValidationError, ValueError, KeyError, TypeError) as exc:
+            response["error"] = str(exc)
+            return response
+        except Exception:
+            # Any other failure still answers this id, or the client waits forever.
+            logger.exception("mcp.call_failed", tool=tool)
+            response["error"] = "internal error"
+            return response
+        response["tool"] = tool
+        response["result"] = result
+        return response
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        async with self._db_slots:
+            async with lifespan_session() as session:
+                yield session
+
+    def require_player(self) -> uuid.UUID:
+        if self.player_id is None:
+            raise ValueError("authenticate first")
+        return self.player_id
+
+    def close_subscription(self) -> None:
+        if self.subscription is not None:
+            event_index.close(self.subscription)
+            self.subscription = None
+
+    def close(self) -> None:
+        for task in list(self._calls):
+            task.cancel()
+        self.close_subscription()
+
+
+async def handle_get_world_state(
+    _: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    world = world_cache.get()
+    if world is None:
+        async with connection.session() as session:
+            world = await TickManager(session).get_world_state()
+    return {
+        "tick": world.tick,
+        "seed": world.seed,
+        "ruleset_version": world.ruleset_version,
+    }
+
+
+async def handle_get_order_book(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    # Served from the in-memory book, which is updated at each tick boundary.
+    books = order_book.books()
+    item_type = params.get("item_type")
+    if item_type is not None:
+        books = {item_type: books.get(item_type, [])}
+    return {"tick": order_book.tick, "seq": order_book.seq, "books": books}
+
+
+async def handle_list_market_listings(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    async with connection.session() as session:
         market = MarketService(session)
         status_value = params.get("status")
         status = MarketStatus(status_value) if status_value else None
@@ -34,42 +188,142 @@ async def handle_list_market_listings(params: Dict[str, Any]) -> Dict[str, Any]:
             seller_id=params.get("seller_id"),
             item_type=params.get("item_type"),
         )
-        return {"listings": [
-            {
-                "id": str(listing.id),
-                "item_type": listing.item_type,
-                "price_amp": int(listing.price_amp_bigint),
-                "status": listing.status.value,
-            }
-            for listing in listings
-        ]}
+        return {
+            "listings": [
+                {
+                    "id": str(listing.id),
+                    "item_type": listing.item_type,
+                    "price_amp": int(listing.price_amp_bigint),
+                    "status": listing.status.value,
+                }
+                for listing in listings
+            ]
+        }
+
+
+async def handle_subscribe_events(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    topics = resolve_topics(params.get("topics") or [ALL_TOPIC], connection.player_id)
+    if connection.subscription is None:
+        connection.subscription = event_index.open(connection.push)
+    event_index.add(connection.subscription, topics)
+    return {"topics": sorted(connection.subscription.topics)}
+
+
+async def handle_unsubscribe_events(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    subscription = connection.subscription
+    if subscription is None:
+        return {"topics": []}
+    if params.get("topics"):
+        topics = resolve_topics(params["topics"], connection.player_id)
+    else:
+        topics = list(subscription.topics)
+    event_index.remove(subscription, topics)
+    if not subscription.topics:
+        connection.close_subscription()
+        return {"topics": []}
+    return {"topics": sorted(subscription.topics)}
+
+
+async def handle_authenticate(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    async with connection.session() as session:
+        player = await player_for_token(session, str(params["token"]))
+    if player is None:
+        raise ValueError("invalid token")
+    connection.player_id = player.id
+    return {"player_id": str(player.id)}
+
+
+async def handle_submit_actions(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    player_id = connection.require_player()
+    actions = [
+        {
+            "actor_id": player_id,
+            "type": action["type"],
+            "payload": action.get("payload", {}),
+        }
+        for action in params["actions"]
+    ]
+    tick, accepted = await get_action_batcher().submit(actions)
+    return {"accepted": [str(action_id) for action_id in accepted], "tick": tick}
 
 
-async def handle_subscribe_events(_: Dict[str, Any]) -> Dict[str, Any]:
-    return {"subscription": "events"}
+def market_action_tool(action_type: str) -> ToolHandler:
+    async def handle(
+        params: Dict[str, Any], connection: McpConnection
+    ) -> Dict[str, Any]:
+        return await handle_submit_actions(
+            {"actions": [{"type": action_type, "payload": params}]}, connection
+        )
+
+    return handle
+
+
+async def handle_transfer(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    player_id = connection.require_player()
+    async with connection.session() as session:
+        balance = await CurrencyService(session).transfer(
+            player_id,
+            uuid.UUID(str(params["recipient_id"])),
+            int(params["amount_mamp"]),
+        )
+        return {"balance_mamp": balance}
+
+
+async def handle_decrypt(
+    params: Dict[str, Any], connection: McpConnection
+) -> Dict[str, Any]:
+    player_id = connection.require_player()
+    async with connection.session() as session:
+        reward, balance = await CurrencyService(session).decrypt_packet(
+            player_id, uuid.UUID(str(params["packet_id"])), dict(params["solution"])
+        )
+        return {"reward_mamp": reward, "balance_mamp": balance}
 
 
 tool_map: Dict[str, ToolHandler] = {
+    "authenticate": handle_authenticate,
+    "submit_actions": handle_submit_actions,
+    "transfer": handle_transfer,
+    "decrypt": handle_decrypt,
+    **{
+        action_type: market_action_tool(action_type)
+        for action_type in MARKET_ACTION_TOOLS
+    },
     "get_world_state": handle_get_world_state,
+    "get_order_book": handle_get_order_book,
     "list_market_listings": handle_list_market_listings,
     "subscribe_events": handle_subscribe_events,
+    "unsubscribe_events": handle_unsubscribe_events,
 }
 
 
 @app.websocket("/mcp")
 async def websocket_endpoint(websocket: WebSocket) -> None:
-    await websocket.accept()
+    wire = await accept(websocket)
+    connection = McpConnection(websocket, wire)
+    # Authenticate once per socket: ?token= / bearer header, or the authenticate tool.
+    connection.player_id = await websocket_player_id(websocket)
+    writer = asyncio.create_task(connection.write())
     try:
         while True:
-            message = await websocket.receive_text()
-            payload = json.loads(message)
-            tool = payload.get("tool")
-            params = payload.get("params", {})
-            handler = tool_map.get(tool)
-            if handler is None:
-                await websocket.send_text(json.dumps({"error": f"unknown tool {tool}"}))
+            try:
+                request = await wire.receive(websocket)
+            except ValueError as exc:
+                connection.reply({"error": f"malformed request: {exc}"})
                 continue
-            result = await handler(params)
-            await websocket.send_text(json.dumps({"tool": tool, "result": result}))
+            await connection.submit(request)
     except WebSocketDisconnect:
         return
+    finally:
+        connection.close()
+        writer.cancel()
@@ -0,0 +1,86 @@
+"""Minimal in-process WebSocket client for ASGI apps.
+
+httpx's ``ASGITransport`` only speaks HTTP, so benchmarks drive ``/v1/ws`` through
+this instead of a real socket.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Optional, Sequence, Union
+
+
+class ASGIWebSocket:
+    def __init__(
+        self,
+        app: Any,
+        path: str,
+        *,
+        headers: Sequence[tuple[str, str]] = (),
+        subprotocols: Sequence[str] = (),
+    ) -> None:
+        raw_path, _, query = path.partition("?")
+        self._app = app
+        self._scope: Dict[str, Any] = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": raw_path,
+            "raw_path": raw_path.encode("ascii"),
+            "root_path": "",
+            "query_string": query.encode("ascii"),
+            "headers": [(b"host", b"bench")]
+            + [
+                (key.lower().encode("latin-1"), value.encode("latin-1"))
+                for key, value in headers
+            ],
+            "subprotocols": list(subprotocols),
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+        self._to_app: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self._from_app: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task[None]] = None
+        self.subprotocol: Optional[str] = None
+
+    async def connect(self) -> "ASGIWebSocket":
+        self._task = asyncio.create_task(
+            self._app(self._scope, self._to_app.get, self._from_app.put)
+        )
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            await self.close()
+            raise ConnectionError(f"WebSocket rejected: {message}")
+        self.subprotocol = message.get("subprotocol")
+        return self
+
+    async def send(self, data: Union[str, bytes]) -> None:
+        key = "text" if isinstance(data, str) else "bytes"
+        await self._to_app.put({"type": "websocket.receive", key: data})
+
+    async def receive(self) -> Union[str, bytes]:
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"WebSocket closed: {message.get('code')}")
+        text = message.get("text")
+        return text if text is not None else message["bytes"]
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        # Handlers blocked on their own queues never read the disconnect.
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._task = None
+
+    async def __aenter__(self) -> "ASGIWebSocket":
+        return await self.connect()
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
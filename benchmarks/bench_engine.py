@@ -0,0 +1,366 @@
+"""End-to-end engine benchmark: ticks, market reads, WebSocket fan-out, replay.
+
+Also sizes the stream wire formats (JSON and, when installed, MessagePack) on
+the events the tick run produced.
+
+Run with ``python -m benchmarks.bench_engine [--database-url URL] [--out FILE]``.
+The target database is dropped and recreated, so point it at a scratch database.
+Compare two result files with ``python -m benchmarks.compare BASE HEAD``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./bench.db"
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarise durations in seconds as milliseconds (nearest-rank percentiles)."""
+
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_database(url: str) -> None:
+    # Settings are read lazily, so the target database must be set before first use.
+    os.environ["APP_ENV"] = "dev"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("REQUEST_LOG_SAMPLE_RATE", "0")
+    from app.core.config import get_settings
+
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+
+
+async def reset_database() -> None:
+    from app.core.config import get_settings
+    from app.core.logging import configure_logging
+    from app.core.world_cache import world_cache
+    from app.domain.rules.registry import registry
+    from app.infra.db import drop_db, init_db
+
+    configure_logging(debug=False)
+    # Per-tick profiles and client request logs would swamp the report.
+    logging.getLogger().setLevel(logging.WARNING)
+    registry.activate(get_settings().ruleset)
+    await drop_db()
+    await init_db()
+    world_cache.invalidate()
+
+
+def bench_token(index: int) -> str:
+    return f"bench-token-{index}"
+
+
+async def seed(players: int, listings: int, rng: random.Random) -> List[uuid.UUID]:
+    """Insert players (authenticating as ``bench_token(index)``) and open listings."""
+
+    from sqlalchemy import insert
+
+    from app.core.auth import hash_token
+    from app.domain import models
+    from app.infra.db import lifespan_session
+
+    player_rows = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "handle": f"bench-{index}",
+            "token_hash": await hash_token(bench_token(index)),
+            "balance_mamp": 1_000_000,
+        }
+        for index in range(players)
+    ]
+    listing_rows = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "seller_id": player_rows[index % players]["id"],
+            "item_type": f"item-{index % 16}",
+            "item_attrs": {},
+            "price_amp_bigint": rng.randint(100, 10_000),
+            "status": models.MarketStatus.open,
+            "created_tick": 0,
+        }
+        for index in range(listings)
+    ]
+    async with lifespan_session() as session:
+        await session.execute(insert(models.Player), player_rows)
+        if listing_rows:
+            await session.execute(insert(models.MarketListing), listing_rows)
+    return [row["id"] for row in player_rows]
+
+
+def _tick_actions(
+    player_ids: List[uuid.UUID], count: int, offset: int
+) -> List[Dict[str, Any]]:
+    actions: List[Dict[str, Any]] = []
+    for index in range(count):
+        actor_id = player_ids[(offset + index) % len(player_ids)]
+        if index % 4 == 3:
+            payload = {"item_type": f"item-{index % 16}", "price_amp": 500 + index}
+            actions.append(
+                {"type": "list_item", "actor_id": actor_id, "payload": payload}
+            )
+        else:
+            actions.append(
+                {"type": "work", "actor_id": actor_id, "payload": {"reward": 100}}
+            )
+    return actions
+
+
+async def bench_ticks(
+    player_ids: List[uuid.UUID], actions_per_tick: int, ticks: int
+) -> Dict[str, Any]:
+    from app.core.ticks import TickManager
+    from app.infra.db import lifespan_session
+
+    durations: List[float] = []
+    applied = 0
+    for tick in range(ticks):
+        actions = _tick_actions(player_ids, actions_per_tick, tick * actions_per_tick)
+        async with lifespan_session() as session:
+            await TickManager(session).enqueue_actions(actions=actions)
+        started = time.perf_counter()
+        async with lifespan_session() as session:
+            result = await TickManager(session).advance_tick()
+        durations.append(time.perf_counter() - started)
+        applied += len(result["applied"])  # type: ignore[arg-type]
+    total = sum(durations)
+    return {
+        "ticks": ticks,
+        "actions_applied": applied,
+        "actions_per_sec": applied / total if total else 0.0,
+        "latency": percentiles(durations),
+    }
+
+
+async def bench_listings(app: Any, requests: int, concurrency: int) -> Dict[str, Any]:
+    import httpx
+
+    durations: List[float] = []
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/v1/market/listings")
+                response.raise_for_status()
+                durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "qps": requests / elapsed if elapsed else 0.0,
+        "latency": percentiles(durations),
+    }
+
+
+async def bench_ws_fanout(app: Any, clients: int, messages: int) -> Dict[str, Any]:
+    from app.core.topics import event_index
+    from app.infra.redis import pubsub
+    from benchmarks.asgi_ws import ASGIWebSocket
+
+    sockets = [ASGIWebSocket(app, "/v1/ws") for _ in range(clients)]
+    for socket in sockets:
+        await socket.connect()
+    # Let every handler reach its subscribe() before publishing.
+    while event_index.subscriber_count < clients:
+        await asyncio.sleep(0)
+    delays: List[float] = []
+
+    async def drain(socket: ASGIWebSocket) -> None:
+        for _ in range(messages):
+            frame = json.loads(await socket.receive())
+            sent = frame["events"][0]["payload"]["sent"]
+            delays.append(time.perf_counter() - sent)
+
+    try:
+        readers = [asyncio.create_task(drain(socket)) for socket in sockets]
+        for index in range(messages):
+            pubsub.publish(
+                "events",
+                {
+                    "id": str(uuid.uuid4()),
+                    "tick": index,
+                    "kind": "bench.ping",
+                    "subject_id": None,
+                    "payload": {"sent": time.perf_counter()},
+                },
+            )
+            await asyncio.sleep(0)
+        await asyncio.gather(*readers)
+    finally:
+        for socket in sockets:
+            await socket.close()
+    return {"clients": clients, "messages": messages, "latency": percentiles(delays)}
+
+
+def _deflated_size(frames: Sequence[bytes]) -> int:
+    # permessage-deflate with context takeover: one raw stream, synced per message.
+    stream = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return sum(
+        len(stream.compress(frame) + stream.flush(zlib.Z_SYNC_FLUSH)) - 4
+        for frame in frames
+    )
+
+
+async def bench_wire(rounds: int = 5) -> Dict[str, Any]:
+    from sqlalchemy import select
+
+    from app.core.events import event_message
+    from app.core.wire import FORMATS, EncodedEvent, encode_events
+    from app.domain import models
+    from app.infra.db import lifespan_session
+
+    async with lifespan_session() as session:
+        rows = await session.execute(
+            select(models.Event).order_by(models.Event.tick, models.Event.seq)
+        )
+        events = [event_message(row) for row in rows.scalars()]
+    if not events:
+        return {"events": 0}
+    results: Dict[str, Any] = {"events": len(events)}
+    for wire in FORMATS.values():
+        started = time.process_time()
+        for _ in range(rounds):
+            single = [encode_events(wire, [EncodedEvent(event)]) for event in events]
+        single_cpu = time.process_time() - started
+        started = time.process_time()
+        for _ in range(rounds):
+            wrapped = [EncodedEvent(event) for event in events]
+            batched = [
+                encode_events(wire, group)
+                for _, group in itertools.groupby(wrapped, key=lambda e: e.tick)
+            ]
+        batched_cpu = time.process_time() - started
+        count = len(events) * rounds
+        results[wire.name] = {
+            "frame_bytes_per_event": sum(map(len, single)) / len(events),
+            "deflated_bytes_per_event": _deflated_size(single) / len(events),
+            "tick_batch_bytes_per_event": sum(map(len, batched)) / len(events),
+            "tick_batch_deflated_bytes_per_event": _deflated_size(batched)
+            / len(events),
+            "encode_us_per_event": single_cpu / count * 1e6,
+            "tick_batch_encode_us_per_event": batched_cpu / count * 1e6,
+        }
+    return results
+
+
+async def bench_replay(ticks: int) -> Dict[str, Any]:
+    from app.core import replay
+    from app.infra.db import lifespan_session
+
+    started = time.perf_counter()
+    async with lifespan_session() as session:
+        valid = await replay.verify_replay(session, start=1, end=ticks)
+    elapsed = time.perf_counter() - started
+    return {
+        "ticks": ticks,
+        "valid": valid,
+        "ticks_per_sec": ticks / elapsed if elapsed else 0.0,
+        "elapsed_ms": elapsed * 1000,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.app import create_app
+    from app.infra.db import get_engine
+
+    await reset_database()
+    player_ids = await seed(args.players, args.listings, random.Random(args.seed))
+    app = create_app()
+    results = {
+        "ticks": await bench_ticks(player_ids, args.actions, args.ticks),
+        "listings": await bench_listings(app, args.requests, args.concurrency),
+        "ws_fanout": await bench_ws_fanout(app, args.ws_clients, args.ws_messages),
+        "wire": await bench_wire(),
+        "replay_verify": await bench_replay(args.ticks),
+    }
+    dialect = get_engine().dialect.name
+    await get_engine().dispose()
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "params": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in {"out", "database_url"}
+            },
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--listings", type=int, default=1_000)
+    parser.add_argument("--actions", type=int, default=300, help="actions per tick")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--ws-messages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+    if args.actions > args.players * 3:
+        parser.error("--actions is capped at 3 per player per tick")
+
+    use_database(args.database_url)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
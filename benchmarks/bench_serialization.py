@@ -0,0 +1,99 @@
+"""Serialization throughput for list endpoints, before and after the orjson path.
+
+Run with ``python -m benchmarks.bench_serialization [--rows 10000]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.v1.routes_entities import ENTITY_COLUMNS
+from app.api.v1.routes_stream import EVENT_COLUMNS
+from app.core import schemas
+from app.core.serialization import encode_rows
+from app.domain import models
+
+
+def _entities(rows: int) -> List[models.Entity]:
+    owner = uuid.uuid4()
+    return [
+        models.Entity(
+            id=uuid.uuid4(),
+            type="relay",
+            owner_id=owner,
+            pos={"x": index % 100, "y": index // 100},
+            attrs={"power": index, "label": f"relay-{index}"},
+            version=1,
+        )
+        for index in range(rows)
+    ]
+
+
+def _events(rows: int) -> List[models.Event]:
+    return [
+        models.Event(
+            id=uuid.uuid4(),
+            tick=index // 50,
+            kind="action.work",
+            subject_id=uuid.uuid4(),
+            payload={"reward": 100, "balance": index * 100},
+        )
+        for index in range(rows)
+    ]
+
+
+def _legacy_encode(schema: type, columns: tuple, objects: list) -> bytes:
+    # ORM -> Pydantic -> response_model validation -> jsonable_encoder -> json.
+    items = [
+        schema(**{column: getattr(obj, column) for column in columns}) for obj in objects
+    ]
+    validated = TypeAdapter(List[schema]).validate_python(items)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def _best_of(repeat: int, func: Callable[[], bytes]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    cases = {
+        "entities": (_entities(rows), schemas.EntitySchema, ENTITY_COLUMNS),
+        "events": (_events(rows), schemas.EventSchema, EVENT_COLUMNS),
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (objects, schema, columns) in cases.items():
+        # The fast path selects column tuples, so start from what the DB returns.
+        tuples = [tuple(getattr(obj, column) for column in columns) for obj in objects]
+        before = _best_of(repeat, lambda: _legacy_encode(schema, columns, objects))
+        after = _best_of(repeat, lambda: encode_rows(columns, tuples))
+        results[name] = {
+            "rows": rows,
+            "before_rows_per_sec": rows / before,
+            "after_rows_per_sec": rows / after,
+            "speedup": before / after,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare two ``bench_engine`` result files.
+
+Run with ``python -m benchmarks.compare BASE.json HEAD.json [--threshold 10]``.
+Exits non-zero when a metric regresses by more than the threshold percentage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+HIGHER_IS_BETTER = ("per_sec", "qps")
+LOWER_IS_BETTER = ("_ms", "_per_event")
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def direction(name: str) -> int:
+    """+1 when larger is better, -1 when smaller is better, 0 for counts."""
+
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(
+    base: Dict[str, Any], head: Dict[str, Any], threshold: float
+) -> Tuple[str, bool]:
+    base_metrics = dict(flatten(base["results"]))
+    head_metrics = dict(flatten(head["results"]))
+    lines = [f"{'metric':<40} {'base':>12} {'head':>12} {'change':>9}"]
+    regressed = False
+    for name, before in base_metrics.items():
+        if name not in head_metrics:
+            continue
+        after = head_metrics[name]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        sign = direction(name)
+        if sign and change * sign < -threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        lines.append(
+            f"{name:<40} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%{flag}"
+        )
+    return "\n".join(lines), regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+    with open(args.base, encoding="utf-8") as handle:
+        base = json.load(handle)
+    with open(args.head, encoding="utf-8") as handle:
+        head = json.load(handle)
+    for label, report in (("base", base), ("head", head)):
+        meta = report.get("meta", {})
+        print(f"{label}: {meta.get('commit')} on {meta.get('database')}")
+    table, regressed = compare(base, head, args.threshold)
+    print(table)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
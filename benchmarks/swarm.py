@@ -0,0 +1,402 @@
+"""Synthetic bot swarm for soak testing the API surfaces in-process.
+
+Run with ``python -m benchmarks.swarm [--bots 500] [--mix trader=2,worker=2,watcher=1]``.
+Bots drive REST over httpx's ASGI transport, ``/v1/ws`` and the MCP socket over
+``benchmarks.asgi_ws``, so no network is needed. Like ``bench_engine`` the target
+database is dropped and recreated, and results can be diffed with ``benchmarks.compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import platform
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.asgi_ws import ASGIWebSocket
+from benchmarks.bench_engine import (
+    DEFAULT_DATABASE_URL,
+    bench_token,
+    git_commit,
+    percentiles,
+    reset_database,
+    seed,
+    use_database,
+)
+
+# Relative weights per operation; see Bot for what each one does.
+BEHAVIORS: Dict[str, Dict[str, int]] = {
+    "trader": {"browse": 4, "list": 3, "buy": 3, "cancel": 1, "work": 1},
+    "worker": {"work": 6, "balance": 2, "transfer": 2, "decrypt": 1},
+    "watcher": {"world": 4, "browse": 3, "mcp_world": 2, "mcp_listings": 1},
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in BEHAVIORS:
+            raise argparse.ArgumentTypeError(f"unknown behavior {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@dataclass
+class Recorder:
+    client: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    server: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def record(
+        self, op: str, elapsed: float, status: str, server_ms: Optional[float] = None
+    ) -> None:
+        self.client[op].append(elapsed)
+        self.statuses[op][status] += 1
+        if server_ms is not None:
+            self.server[op].append(server_ms / 1000)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            op: {
+                "count": len(samples),
+                "status": dict(self.statuses[op]),
+                "client": percentiles(samples),
+                "server": percentiles(self.server.get(op, [])),
+            }
+            for op, samples in sorted(self.client.items())
+        }
+
+
+def server_timing(response: httpx.Response) -> Optional[float]:
+    for metric in response.headers.get("server-timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "app" and params.startswith("dur="):
+            return float(params[4:])
+    return None
+
+
+@dataclass
+class SwarmState:
+    player_ids: List[uuid.UUID]
+    open_listings: List[str] = field(default_factory=list)
+
+
+class Bot:
+    def __init__(
+        self,
+        index: int,
+        behavior: str,
+        client: httpx.AsyncClient,
+        mcp_app: Any,
+        state: SwarmState,
+        recorder: Recorder,
+        rng: random.Random,
+    ) -> None:
+        self.player_id = state.player_ids[index]
+        self.headers = {"Authorization": f"Bearer {bench_token(index)}"}
+        self.behavior = behavior
+        self.client = client
+        self.mcp_app = mcp_app
+        self.state = state
+        self.recorder = recorder
+        self.rng = rng
+        self.own_listings: List[str] = []
+        self._mcp: Optional[ASGIWebSocket] = None
+        weights = BEHAVIORS[behavior]
+        self._ops = list(weights)
+        self._weights = list(weights.values())
+
+    async def run(self, rate: float, deadline: float) -> None:
+        try:
+            while True:
+                # Poisson arrivals: exponential gaps at ``rate`` operations per second.
+                await asyncio.sleep(self.rng.expovariate(rate))
+                if time.perf_counter() >= deadline:
+                    return
+                op = self.rng.choices(self._ops, self._weights)[0]
+                await getattr(self, f"op_{op}")()
+        finally:
+            if self._mcp is not None:
+                await self._mcp.close()
+
+    async def _http(
+        self, op: str, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(
+            method, url, headers=self.headers, **kwargs
+        )
+        self.recorder.record(
+            op,
+            time.perf_counter() - started,
+            str(response.status_code),
+            server_timing(response),
+        )
+        return response
+
+    async def _mcp_call(
+        self, op: str, tool: str, params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if self._mcp is None:
+            self._mcp = await ASGIWebSocket(self.mcp_app, "/mcp").connect()
+        started = time.perf_counter()
+        await self._mcp.send(json.dumps({"tool": tool, "params": params}))
+        reply = json.loads(await self._mcp.receive())
+        self.recorder.record(
+            op, time.perf_counter() - started, "error" if "error" in reply else "ok"
+        )
+        return reply
+
+    async def op_world(self) -> None:
+        await self._http("world", "GET", "/v1/world/")
+
+    async def op_browse(self) -> None:
+        response = await self._http(
+            "browse", "GET", "/v1/market/listings", params={"status": "open"}
+        )
+        if response.status_code == 200:
+            listings = response.json()
+            if listings:
+                sample = self.rng.sample(listings, min(len(listings), 20))
+                self.state.open_listings[:] = [listing["id"] for listing in sample]
+
+    async def op_list(self) -> None:
+        payload = {
+            "item_type": f"item-{self.rng.randrange(16)}",
+            "price_amp": self.rng.randint(100, 5_000),
+        }
+        response = await self._http("list", "POST", "/v1/market/listings", json=payload)
+        if response.status_code == 200:
+            listing_id = response.json()["id"]
+            self.own_listings.append(listing_id)
+            self.state.open_listings.append(listing_id)
+
+    async def op_buy(self) -> None:
+        if not self.state.open_listings:
+            return await self.op_browse()
+        listing_id = self.rng.choice(self.state.open_listings)
+        response = await self._http(
+            "buy", "POST", f"/v1/market/listings/{listing_id}/buy"
+        )
+        if (
+            response.status_code in (200, 400)
+            and listing_id in self.state.open_listings
+        ):
+            self.state.open_listings.remove(listing_id)
+
+    async def op_cancel(self) -> None:
+        if not self.own_listings:
+            return await self.op_list()
+        listing_id = self.own_listings.pop(self.rng.randrange(len(self.own_listings)))
+        await self._http("cancel", "POST", f"/v1/market/listings/{listing_id}/cancel")
+
+    async def op_work(self) -> None:
+        action = {
+            "type": "work",
+            "actor_id": str(self.player_id),
+            "payload": {"reward": 100},
+        }
+        await self._http("work", "POST", "/v1/actions/", json={"actions": [action]})
+
+    async def op_balance(self) -> None:
+        await self._http("balance", "GET", "/v1/currency/balance")
+
+    async def op_transfer(self) -> None:
+        recipient = self.rng.choice(self.state.player_ids)
+        if recipient == self.player_id:
+            return
+        payload = {
+            "recipient_id": str(recipient),
+            "amount_mamp": self.rng.randint(1, 100),
+        }
+        await self._http("transfer", "POST", "/v1/currency/transfer", json=payload)
+
+    async def op_decrypt(self) -> None:
+        puzzle = {
+            "type": "hash-chain",
+            "difficulty": 1,
+            "target_prefix": "0",
+            "seed": uuid.uuid4().hex,
+            "reward_mamp": 250,
+        }
+        response = await self._http(
+            "mint",
+            "POST",
+            "/v1/currency/mint_encrypted",
+            json={"denom": "mAMP", "payload": puzzle},
+        )
+        if response.status_code != 200:
+            return
+        solution = {"nonce": _solve(puzzle)}
+        await self._http(
+            "decrypt",
+            "POST",
+            "/v1/currency/decrypt",
+            json={"packet_id": response.json()["id"], "solution": solution},
+        )
+
+    async def op_mcp_world(self) -> None:
+        await self._mcp_call("mcp_world", "get_world_state", {})
+
+    async def op_mcp_listings(self) -> None:
+        await self._mcp_call("mcp_listings", "list_market_listings", {"status": "open"})
+
+
+def _solve(puzzle: Dict[str, Any]) -> str:
+    prefix = puzzle["target_prefix"][: puzzle["difficulty"]]
+    nonce = 0
+    while True:
+        digest = hashlib.sha256(f"{puzzle['seed']}:{nonce}".encode("utf-8")).hexdigest()
+        if digest.startswith(prefix):
+            return str(nonce)
+        nonce += 1
+
+
+async def run_ticker(
+    client: httpx.AsyncClient, interval: float, deadline: float, recorder: Recorder
+) -> List[float]:
+    """Advance ticks on a fixed cadence; returns server-reported tick durations."""
+
+    durations: List[float] = []
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(interval)
+        started = time.perf_counter()
+        response = await client.post("/v1/admin/tick/advance")
+        recorder.record(
+            "tick",
+            time.perf_counter() - started,
+            str(response.status_code),
+            server_timing(response),
+        )
+        if response.status_code == 200:
+            durations.append(response.json()["profile"]["duration_ms"] / 1000)
+    return durations
+
+
+async def run_watcher(app: Any, deadline: float) -> int:
+    received = 0
+    async with ASGIWebSocket(app, "/v1/ws") as socket:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return received
+            try:
+                await asyncio.wait_for(socket.receive(), remaining)
+            except asyncio.TimeoutError:
+                return received
+            received += 1
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.app import create_app
+    from app.infra.db import get_engine
+    from app.mcp.server import app as mcp_app
+
+    await reset_database()
+    rng = random.Random(args.seed)
+    player_ids = await seed(args.bots, args.listings, rng)
+    state = SwarmState(player_ids=player_ids)
+    recorder = Recorder()
+    app = create_app()
+    behaviors = list(args.mix)
+    weights = list(args.mix.values())
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://swarm", limits=limits, timeout=None
+    ) as client:
+        bots = [
+            Bot(
+                index,
+                rng.choices(behaviors, weights)[0],
+                client,
+                mcp_app,
+                state,
+                recorder,
+                random.Random(rng.getrandbits(64)),
+            )
+            for index in range(args.bots)
+        ]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        watchers = [run_watcher(app, deadline) for _ in range(args.ws_clients)]
+        outcomes = await asyncio.gather(
+            run_ticker(client, args.tick_interval, deadline, recorder),
+            asyncio.gather(*watchers),
+            *(bot.run(args.rate, deadline) for bot in bots),
+        )
+        elapsed = time.perf_counter() - started
+
+    tick_durations, ws_received = outcomes[0], outcomes[1]
+    dialect = get_engine().dialect.name
+    await get_engine().dispose()
+    total_ops = sum(len(samples) for samples in recorder.client.values())
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "params": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in {"out", "database_url"}
+            },
+            "population": dict(Counter(bot.behavior for bot in bots)),
+        },
+        "results": {
+            "ops_per_sec": total_ops / elapsed if elapsed else 0.0,
+            "ops": recorder.report(),
+            "ticks": {
+                "count": len(tick_durations),
+                "server": percentiles(tick_durations),
+            },
+            "ws": {
+                "clients": args.ws_clients,
+                "frames_received": sum(ws_received),
+            },
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--bots", type=int, default=200)
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix("trader=2,worker=2,watcher=1")
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1.0, help="operations per second per bot"
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--tick-interval", type=float, default=1.0, help="seconds")
+    parser.add_argument("--listings", type=int, default=500)
+    parser.add_argument("--ws-clients", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import uuid
 
+from app.core.config import get_settings
+from app.infra import intake_log
+
 
 def test_work_action_increases_balance(app_client, create_player):
     app_client.post("/v1/admin/world/reset")
@@ -30,3 +33,44 @@ def test_work_action_increases_balance(app_client, create_player):
     )
     assert balance_res.status_code == 200
     assert balance_res.json()["balance_mamp"] == 250
+
+
+def test_action_quota_spans_requests(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    token = f"token-{uuid.uuid4()}"
+    player = create_player(f"quota-{uuid.uuid4()}", token, balance=0)
+    headers = {"Authorization": f"Bearer {token}"}
+    work = {"type": "work", "actor_id": str(player.id), "payload": {"reward": 1}}
+
+    first = app_client.post("/v1/actions", json={"actions": [work] * 3}, headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()["accepted"]) == 3
+
+    second = app_client.post("/v1/actions", json={"actions": [work]}, headers=headers)
+    assert second.status_code == 400
+
+    unknown = {"type": "teleport", "actor_id": str(player.id), "payload": {}}
+    app_client.post("/v1/admin/tick/advance")
+    rejected = app_client.post("/v1/actions", json={"actions": [unknown]}, headers=headers)
+    assert rejected.status_code == 400
+
+
+def test_log_intake_feeds_tick(app_client, create_player, monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "action_intake", "log")
+    monkeypatch.setattr(get_settings(), "intake_log_dir", str(tmp_path))
+    monkeypatch.setattr(intake_log, "_intake_log", None)
+    app_client.post("/v1/admin/world/reset")
+    token = f"token-{uuid.uuid4()}"
+    player = create_player(f"logged-{uuid.uuid4()}", token, balance=0)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    work = {"type": "work", "actor_id": str(player.id), "payload": {"reward": 7}}
+    response = app_client.post("/v1/actions", json={"actions": [work]}, headers=headers)
+    assert response.status_code == 200
+    assert list(tmp_path.glob("tick-*.log"))
+
+    advance = app_client.post("/v1/admin/tick/advance")
+    assert [action["type"] for action in advance.json()["applied"]] == ["work"]
+    assert not list(tmp_path.glob("tick-*.log"))
+    balance = app_client.get("/v1/currency/balance", headers=headers)
+    assert balance.json()["balance_mamp"] == 7
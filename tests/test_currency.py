@@ -1,5 +1,7 @@
 import uuid
 
+from app.core.player_views import PlayerViews, player_views
+
 
 def test_mint_and_decrypt_packet(app_client, create_player):
     app_client.post("/v1/admin/world/reset")
@@ -30,3 +32,80 @@ def test_mint_and_decrypt_packet(app_client, create_player):
     )
     assert decrypt_res.status_code == 200
     assert decrypt_res.json()["balance_mamp"] == 2000
+
+
+def test_player_views_skip_racing_fills():
+    views = PlayerViews(max_players=2)
+    alice, bob, carol = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    stamp = views.stamp()
+    views.begin_write(alice)
+    views.fill(alice, stamp, "balance", 10)  # read raced with an open write
+    assert views.get(alice) is None
+    views.finish_write({alice: {"balance": 15}}, committed=True)
+    assert views.get(alice) is None  # nothing cached yet, nothing to update
+    views.fill(alice, stamp, "balance", 10)  # stamp predates the commit
+    assert views.get(alice) is None
+    views.fill(alice, views.stamp(), "balance", 15)
+    assert views.get(alice).balance == 15
+
+    views.begin_write(alice)
+    views.begin_write(alice)
+    views.finish_write({alice: {"balance": 20}}, committed=True)
+    views.finish_write({alice: {"balance": 25}}, committed=True)
+    assert views.get(alice).balance is None  # overlapping writers: order unknown
+
+    views.push_balances([(alice, 25), (bob, 5), (carol, 7)], views.stamp())
+    assert (views.get(alice).balance, views.get(bob).balance) == (25, 5)
+    assert views.get(carol) is None  # a tick push never evicts
+
+
+def test_player_views_follow_writes(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    token = f"views-{uuid.uuid4()}"
+    sender = create_player(f"views-{uuid.uuid4()}", token, balance=1000)
+    recipient = create_player(f"views-{uuid.uuid4()}", f"views-{uuid.uuid4()}", 0)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    assert app_client.get("/v1/currency/balance", headers=auth).json() == {
+        "balance_mamp": 1000
+    }
+    assert player_views.get(sender.id).balance == 1000
+    transfer = app_client.post(
+        "/v1/currency/transfer",
+        json={"recipient_id": str(recipient.id), "amount_mamp": 300},
+        headers=auth,
+    )
+    assert transfer.json() == {"balance_mamp": 700}
+    assert player_views.get(sender.id).balance == 700
+
+    assert app_client.get("/v1/currency/packets", headers=auth).json() == []
+    app_client.post(
+        "/v1/currency/mint_encrypted",
+        json={"denom": "mAMP", "payload": {}},
+        headers=auth,
+    )
+    assert len(app_client.get("/v1/currency/packets", headers=auth).json()) == 1
+
+    mine = {"seller_id": str(sender.id)}
+    assert app_client.get("/v1/market/listings", params=mine).json() == []
+    app_client.post(
+        "/v1/market/listings", json={"item_type": "ore", "price_amp": 5}, headers=auth
+    )
+    listed = app_client.get("/v1/market/listings", params={**mine, "status": "open"})
+    assert [listing["item_type"] for listing in listed.json()] == ["ore"]
+
+    app_client.post(
+        "/v1/actions",
+        json={
+            "actions": [
+                {"type": "work", "actor_id": str(sender.id), "payload": {"reward": 50}}
+            ]
+        },
+        headers=auth,
+    )
+    app_client.post("/v1/admin/tick/advance")
+    assert player_views.get(sender.id).balance == 750
+    assert app_client.get("/v1/currency/balance", headers=auth).json() == {
+        "balance_mamp": 750
+    }
@@ -0,0 +1,152 @@
+import asyncio
+import math
+import random
+import uuid
+
+from app.api.v1 import routes_entities
+from app.core.spatial import SpatialGrid
+from app.domain.services.entity_service import EntityService
+from app.infra.db import lifespan_session
+
+
+def test_spatial_grid_matches_brute_force():
+    rng = random.Random(7)
+    grid = SpatialGrid(cell_size=5.0)
+    points = {
+        uuid.uuid4(): (rng.uniform(-50, 50), rng.uniform(-50, 50)) for _ in range(300)
+    }
+    grid.load(points.items())
+    moved = next(iter(points))
+    points[moved] = (1.0, 1.0)
+    grid.apply([(moved, points[moved])])
+
+    near = grid.near(3.0, -4.0, 12.5)
+    expected = {
+        entity_id
+        for entity_id, (x, y) in points.items()
+        if math.hypot(x - 3.0, y + 4.0) <= 12.5
+    }
+    assert {entity_id for entity_id, _ in near} == expected
+    assert [distance for _, distance in near] == sorted(d for _, d in near)
+
+    inside = set(grid.within(-10, -20, 15, 0))
+    assert inside == {
+        entity_id
+        for entity_id, (x, y) in points.items()
+        if -10 <= x <= 15 and -20 <= y <= 0
+    }
+    assert set(grid.within(-1000, -1000, 1000, 1000)) == set(points)
+
+
+def test_entities_near_and_bbox(app_client, create_player, monkeypatch):
+    app_client.post("/v1/admin/world/reset")
+    token = f"fleet-{uuid.uuid4()}"
+    owner = create_player(f"fleet-{uuid.uuid4()}", token, balance=0)
+
+    async def spawn():
+        async with lifespan_session() as session:
+            service = EntityService(session)
+            created = []
+            for x, y in [(0, 0), (3, 4), (10, 0), (40, 40)]:
+                entity = await service.create_entity(
+                    type="drone", owner_id=owner.id, pos={"x": x, "y": y}
+                )
+                created.append(str(entity.id))
+            await service.create_entity(type="relay", owner_id=None, pos=None)
+            return created
+
+    origin, diagonal, east, far = asyncio.run(spawn())
+
+    near = app_client.get("/v1/entities", params={"near": "0,0", "radius": 10})
+    assert [entity["id"] for entity in near.json()] == [origin, diagonal, east]
+    box = app_client.get("/v1/entities", params={"bbox": "2,2,50,50"})
+    assert sorted(entity["id"] for entity in box.json()) == sorted([diagonal, far])
+    assert app_client.get("/v1/entities", params={"near": "0,0"}).status_code == 400
+
+    app_client.post(
+        "/v1/actions",
+        json={
+            "actions": [
+                {
+                    "type": "move_entity",
+                    "actor_id": str(owner.id),
+                    "payload": {"entity_id": far, "pos": {"x": 1, "y": 1}},
+                }
+            ]
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    app_client.post("/v1/admin/tick/advance")
+    near = app_client.get(
+        "/v1/entities", params={"near": "0,0", "radius": 2, "type": "drone"}
+    )
+    assert [entity["id"] for entity in near.json()] == [origin, far]
+
+    # Filtered spatial reads page through the grid's ids until limit rows match.
+    monkeypatch.setattr(routes_entities, "SPATIAL_FETCH_CHUNK", 1)
+    params = {"near": "0,0", "radius": 15, "type": "drone", "limit": 3}
+    near = app_client.get("/v1/entities", params=params)
+    assert [entity["id"] for entity in near.json()] == [origin, far, diagonal]
+    box = app_client.get("/v1/entities", params={"bbox": "-1,-1,50,50", "limit": 2})
+    assert len(box.json()) == 2
+
+
+def test_entity_compare_and_swap(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    token = f"cas-{uuid.uuid4()}"
+    owner = create_player(f"cas-{uuid.uuid4()}", token, balance=0)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    created = app_client.post(
+        "/v1/entities/", json={"type": "drone", "pos": {"x": 0, "y": 0}}, headers=auth
+    )
+    assert created.status_code == 201
+    entity_id = created.json()["id"]
+    assert created.headers["etag"] == '"1"'
+    url = f"/v1/entities/{entity_id}"
+
+    assert app_client.get(url, headers={"If-None-Match": '"1"'}).status_code == 304
+    assert app_client.get(url, headers={"If-Match": '"7"'}).status_code == 412
+    assert app_client.patch(url, json={"attrs": {}}, headers=auth).status_code == 428
+    patched = app_client.patch(
+        url, json={"attrs": {"hp": 9}}, headers={**auth, "If-Match": '"1"'}
+    )
+    assert patched.status_code == 200
+    assert patched.headers["etag"] == '"2"'
+    assert patched.json()["attrs"] == {"hp": 9}
+    stale = app_client.patch(
+        url, json={"attrs": {"hp": 0}}, headers={**auth, "If-Match": '"1"'}
+    )
+    assert stale.status_code == 412
+
+    others = [
+        app_client.post("/v1/entities/", json={"type": "drone"}, headers=auth)
+        for _ in range(2)
+    ]
+    others = [response.json()["id"] for response in others]
+    queued = app_client.post(
+        "/v1/entities/updates",
+        json={
+            "updates": [
+                {"entity_id": entity_id, "version": 2, "pos": {"x": 5, "y": 5}},
+                {"entity_id": entity_id, "version": 2, "attrs": {"hp": 1}},
+                {"entity_id": others[0], "version": 1, "attrs": {"hp": 3}},
+                {"entity_id": others[1], "version": 4, "attrs": {"hp": 3}},
+            ]
+        },
+        headers=auth,
+    )
+    assert queued.status_code == 200
+    result = app_client.post("/v1/admin/tick/advance").json()
+    assert result["entity_updates"]["applied"] == [
+        {"entity_id": entity_id, "version": 3},
+        {"entity_id": others[0], "version": 2},
+    ]
+    conflicts = result["entity_updates"]["conflicts"]
+    assert sorted(c["entity_id"] for c in conflicts) == sorted([entity_id, others[1]])
+    moved = app_client.get(url).json()
+    assert moved["pos"] == {"x": 5, "y": 5} and moved["version"] == 3
+    assert moved["attrs"] == {"hp": 9}
+    near = app_client.get("/v1/entities", params={"near": "5,5", "radius": 1})
+    assert [entity["id"] for entity in near.json()] == [entity_id]
+    assert str(owner.id) == moved["owner_id"]
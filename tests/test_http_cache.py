@@ -0,0 +1,35 @@
+import uuid
+
+
+def test_world_etag_revalidates_until_tick_advances(app_client):
+    app_client.post("/v1/admin/world/reset")
+    first = app_client.get("/v1/world/")
+    etag = first.headers["etag"]
+
+    cached = app_client.get("/v1/world/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    app_client.post("/v1/admin/tick/advance")
+    fresh = app_client.get("/v1/world/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+def test_listings_etag_changes_on_write(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    token = f"etag-{uuid.uuid4()}"
+    create_player(f"etag-{uuid.uuid4()}", token, balance=0)
+    app_client.get("/v1/world/")
+
+    before = app_client.get("/v1/market/listings")
+    assert before.json() == []
+    app_client.post(
+        "/v1/market/listings",
+        json={"item_type": "raw-data", "price_amp": 10},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    after = app_client.get(
+        "/v1/market/listings", headers={"If-None-Match": before.headers["etag"]}
+    )
+    assert after.status_code == 200
+    assert len(after.json()) == 1
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import uuid
+
+from app.core.logging import _orjson_dumps, should_log_request
+
+
+def test_request_sampling_keeps_errors() -> None:
+    assert should_log_request(0.0, 500)
+    assert not should_log_request(0.0, 200)
+    assert should_log_request(1.0, 200)
+
+
+def test_orjson_renderer_falls_back_to_default() -> None:
+    value = uuid.uuid4()
+    assert _orjson_dumps({"id": value}, default=str) == f'{{"id":"{value}"}}'
@@ -16,6 +16,9 @@ def test_market_buy_flow(app_client, create_player):
     assert listing_res.status_code == 200
     listing_id = listing_res.json()["id"]
 
+    open_listings = app_client.get("/v1/market/listings", params={"status": "open"})
+    assert [row["price_amp"] for row in open_listings.json()] == [1_500]
+
     buy_res = app_client.post(
         f"/v1/market/listings/{listing_id}/buy",
         headers={"Authorization": f"Bearer {buyer_token}"},
@@ -31,3 +34,189 @@ def test_market_buy_flow(app_client, create_player):
     )
     assert seller_balance.json()["balance_mamp"] == 1_500
     assert buyer_balance.json()["balance_mamp"] == 8_500
+
+
+def test_matching_engine_price_time_priority(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    players = {}
+    for name, balance in [("ask_hi", 0), ("ask_lo", 0), ("bid_lo", 5_000), ("bid_hi", 5_000)]:
+        token = f"{name}-{uuid.uuid4()}"
+        players[name] = (create_player(f"{name}-{uuid.uuid4()}", token, balance=balance), token)
+
+    def submit(name, action_type, payload):
+        player, token = players[name]
+        action = {"type": action_type, "actor_id": str(player.id), "payload": payload}
+        response = app_client.post(
+            "/v1/actions",
+            json={"actions": [action]},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
+
+    def balance(name):
+        response = app_client.get(
+            "/v1/currency/balance",
+            headers={"Authorization": f"Bearer {players[name][1]}"},
+        )
+        return response.json()["balance_mamp"]
+
+    submit("ask_hi", "place_ask", {"item_type": "ice-breaker", "price_amp": 1_000})
+    submit("bid_lo", "place_bid", {"item_type": "ice-breaker", "price_amp": 900})
+    submit("ask_lo", "place_ask", {"item_type": "ice-breaker", "price_amp": 800})
+    submit("bid_hi", "place_bid", {"item_type": "ice-breaker", "price_amp": 1_200})
+    advance = app_client.post("/v1/admin/tick/advance").json()
+
+    # The best bid takes the cheapest ask at the ask's price; 900 cannot reach 1_000.
+    assert [(fill["price_amp"], fill["refund_mamp"]) for fill in advance["fills"]] == [
+        (800, 400)
+    ]
+    assert advance["fills"][0]["buyer_id"] == str(players["bid_hi"][0].id)
+    assert balance("bid_hi") == 4_200
+    assert balance("ask_lo") == 800
+    assert balance("bid_lo") == 4_100
+    open_listings = app_client.get("/v1/market/listings", params={"status": "open"})
+    assert [row["price_amp"] for row in open_listings.json()] == [1_000]
+
+    events = app_client.get("/v1/events", params={"since_tick": 0}).json()
+    filled = [event for event in events if event["kind"] == "market.listing_filled"]
+    assert [event["payload"]["price_amp"] for event in filled] == [800]
+
+    bid_id = next(
+        event["subject_id"]
+        for event in events
+        if event["kind"] == "market.bid_placed" and event["payload"]["price_amp"] == 900
+    )
+    submit("bid_lo", "cancel_bid", {"bid_id": bid_id})
+    app_client.post("/v1/admin/tick/advance")
+    assert balance("bid_lo") == 5_000
+
+
+def test_reset_drops_open_bids_and_refunds_escrow(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    bidder_token = f"bidder-{uuid.uuid4()}"
+    seller_token = f"seller-{uuid.uuid4()}"
+    bidder = create_player(f"bidder-{uuid.uuid4()}", bidder_token, balance=1_000)
+    create_player(f"seller-{uuid.uuid4()}", seller_token, balance=0)
+    bidder_auth = {"Authorization": f"Bearer {bidder_token}"}
+
+    action = {
+        "type": "place_bid",
+        "actor_id": str(bidder.id),
+        "payload": {"item_type": "relic", "price_amp": 400},
+    }
+    app_client.post("/v1/actions", json={"actions": [action]}, headers=bidder_auth)
+    app_client.post("/v1/admin/tick/advance")
+    balance = app_client.get("/v1/currency/balance", headers=bidder_auth).json()
+    assert balance["balance_mamp"] == 600
+
+    assert app_client.post("/v1/admin/world/reset").status_code == 200
+    balance = app_client.get("/v1/currency/balance", headers=bidder_auth).json()
+    assert balance["balance_mamp"] == 1_000
+
+    app_client.post(
+        "/v1/market/listings",
+        json={"item_type": "relic", "price_amp": 300},
+        headers={"Authorization": f"Bearer {seller_token}"},
+    )
+    advance = app_client.post("/v1/admin/tick/advance").json()
+    assert advance["fills"] == []
+    open_listings = app_client.get("/v1/market/listings", params={"status": "open"})
+    assert [row["price_amp"] for row in open_listings.json()] == [300]
+
+
+def test_bids_beyond_balance_are_rejected_without_failing_the_tick(
+    app_client, create_player
+):
+    app_client.post("/v1/admin/world/reset")
+    token = f"bidder-{uuid.uuid4()}"
+    bidder = create_player(f"bidder-{uuid.uuid4()}", token, balance=1_000)
+    auth = {"Authorization": f"Bearer {token}"}
+    bid = {
+        "type": "place_bid",
+        "actor_id": str(bidder.id),
+        "payload": {"item_type": "relic", "price_amp": 900},
+    }
+    # Each bid alone fits the balance at enqueue; together they do not.
+    queued = app_client.post("/v1/actions", json={"actions": [bid, bid]}, headers=auth)
+    assert queued.status_code == 200
+
+    advance = app_client.post("/v1/admin/tick/advance")
+    assert advance.status_code == 200
+    results = [action["result"] for action in advance.json()["applied"]]
+    assert "bid_id" in results[0]
+    assert results[1] == {"rejected": "Insufficient balance"}
+    balance = app_client.get("/v1/currency/balance", headers=auth).json()
+    assert balance["balance_mamp"] == 100
+    assert app_client.post("/v1/admin/tick/advance").status_code == 200
+
+
+def test_cancel_bid_rejects_unknown_and_repeated_cancels(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    token = f"bidder-{uuid.uuid4()}"
+    bidder = create_player(f"bidder-{uuid.uuid4()}", token, balance=1_000)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def action(action_type, payload):
+        return {"type": action_type, "actor_id": str(bidder.id), "payload": payload}
+
+    place = action("place_bid", {"item_type": "relic", "price_amp": 400})
+    app_client.post("/v1/actions", json={"actions": [place]}, headers=auth)
+    placed = app_client.post("/v1/admin/tick/advance").json()["applied"]
+    bid_id = placed[0]["result"]["bid_id"]
+
+    bogus = action("cancel_bid", {"bid_id": str(uuid.uuid4())})
+    queued = app_client.post("/v1/actions", json={"actions": [bogus]}, headers=auth)
+    assert queued.status_code == 400
+
+    # Both cancels see an open bid at enqueue; only the first can apply.
+    cancel = action("cancel_bid", {"bid_id": bid_id})
+    queued = app_client.post(
+        "/v1/actions", json={"actions": [cancel, cancel]}, headers=auth
+    )
+    assert queued.status_code == 200
+    advance = app_client.post("/v1/admin/tick/advance")
+    assert advance.status_code == 200
+    results = [entry["result"] for entry in advance.json()["applied"]]
+    assert results[0] == {"bid_id": bid_id}
+    assert results[1] == {"rejected": "Bid not open"}
+    balance = app_client.get("/v1/currency/balance", headers=auth).json()
+    assert balance["balance_mamp"] == 1_000
+    assert app_client.post("/v1/admin/tick/advance").status_code == 200
+
+
+def test_price_history_bars(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    seller_token = f"seller-{uuid.uuid4()}"
+    buyer_token = f"buyer-{uuid.uuid4()}"
+    create_player(f"seller-{uuid.uuid4()}", seller_token, balance=0)
+    create_player(f"buyer-{uuid.uuid4()}", buyer_token, balance=100_000)
+
+    for price in (1_200, 900, 1_500):
+        listing = app_client.post(
+            "/v1/market/listings",
+            json={"item_type": "coolant", "price_amp": price},
+            headers={"Authorization": f"Bearer {seller_token}"},
+        ).json()
+        app_client.post(
+            f"/v1/market/listings/{listing['id']}/buy",
+            headers={"Authorization": f"Bearer {buyer_token}"},
+        )
+
+    bars = app_client.get(
+        "/v1/market/history", params={"item_type": "coolant", "interval": 10}
+    ).json()
+    assert bars == [
+        {
+            "start_tick": 0,
+            "open": 1_200,
+            "high": 1_500,
+            "low": 900,
+            "close": 1_500,
+            "volume": 3,
+            "notional": 3_600,
+        }
+    ]
+    invalid = app_client.get(
+        "/v1/market/history", params={"item_type": "coolant", "interval": 7}
+    )
+    assert invalid.status_code == 400
@@ -0,0 +1,88 @@
+import uuid
+
+
+def test_mcp_batches_pipelining_and_subscriptions(app_client):
+    app_client.post("/v1/admin/world/reset")
+
+    with app_client.websocket_connect("/mcp") as websocket:
+        websocket.send_json({"id": 1, "tool": "get_world_state"})
+        websocket.send_json({"id": 2, "tool": "get_order_book"})
+        replies = {
+            reply["id"]: reply for reply in (websocket.receive_json() for _ in "ab")
+        }
+        assert replies[1]["result"]["tick"] == 0
+        assert replies[2]["result"]["books"] == {}
+
+        websocket.send_json(
+            [
+                {"id": "a", "tool": "get_world_state"},
+                {"id": "b", "tool": "nope"},
+                {
+                    "id": "c",
+                    "tool": "subscribe_events",
+                    "params": {"topics": ["kind:tick"]},
+                },
+            ]
+        )
+        batch = websocket.receive_json()
+        assert [reply["id"] for reply in batch] == ["a", "b", "c"]
+        assert batch[1]["error"] == "unknown tool nope"
+        assert batch[2]["result"] == {"topics": ["kind:tick"]}
+
+        app_client.post("/v1/admin/tick/advance")
+        pushed = websocket.receive_json()
+        assert [event["kind"] for event in pushed["events"]] == ["tick.advance"]
+
+        websocket.send_json({"id": 3, "tool": "unsubscribe_events"})
+        assert websocket.receive_json()["result"] == {"topics": []}
+
+        # An unexpected handler error still answers the request's id.
+        websocket.send_json({"id": 4, "tool": "get_order_book", "params": [1]})
+        assert websocket.receive_json() == {"id": 4, "error": "internal error"}
+        websocket.send_json({"id": 5, "tool": "get_world_state"})
+        assert websocket.receive_json()["id"] == 5
+
+
+def test_mcp_actions_are_authenticated_and_batched(app_client, create_player):
+    app_client.post("/v1/admin/world/reset")
+    tokens = [f"agent-{uuid.uuid4()}" for _ in range(3)]
+    players = [create_player(f"agent-{uuid.uuid4()}", token, 0) for token in tokens]
+
+    sockets = [
+        app_client.websocket_connect(f"/mcp?token={token}") for token in tokens[:2]
+    ]
+    with (
+        sockets[0] as first,
+        sockets[1] as second,
+        app_client.websocket_connect("/mcp") as anonymous,
+    ):
+        anonymous.send_json({"id": 1, "tool": "work", "params": {}})
+        assert "error" in anonymous.receive_json()
+        anonymous.send_json(
+            {"id": 2, "tool": "submit_actions", "params": {"actions": []}}
+        )
+        assert anonymous.receive_json()["error"] == "authenticate first"
+        anonymous.send_json(
+            {"id": 3, "tool": "authenticate", "params": {"token": tokens[2]}}
+        )
+        assert anonymous.receive_json()["result"] == {"player_id": str(players[2].id)}
+
+        work = {"actions": [{"type": "work", "payload": {"reward": 7}}]}
+        for socket in (first, second, anonymous):
+            socket.send_json({"id": "w", "tool": "submit_actions", "params": work})
+        # A bad submission in the same window is rejected on its own.
+        first.send_json({"id": "bad", "tool": "list_item", "params": {}})
+        replies = [socket.receive_json() for socket in (first, second, anonymous)]
+        replies.append(first.receive_json())
+        by_id = {reply["id"]: reply for reply in replies if reply["id"] == "bad"}
+        assert "error" in by_id["bad"]
+        accepted = [reply for reply in replies if reply["id"] == "w"]
+        assert len(accepted) == 3
+        assert all(len(reply["result"]["accepted"]) == 1 for reply in accepted)
+
+    app_client.post("/v1/admin/tick/advance")
+    for token in tokens:
+        balance = app_client.get(
+            "/v1/currency/balance", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert balance.json()["balance_mamp"] == 7
@@ -0,0 +1,37 @@
+import json
+
+from app.core.config import get_settings
+from app.core.metrics import MetricsRegistry
+
+
+def test_tick_profile_is_exported(app_client):
+    app_client.post("/v1/admin/world/reset")
+    advance = app_client.post("/v1/admin/tick/advance")
+    profile = advance.json()["profile"]
+    assert {"apply", "event_flush", "snapshot", "hash"} <= set(profile["phases_ms"])
+    assert profile["sql_statements"] > 0
+
+    body = app_client.get("/metrics").text
+    assert 'cb_tick_phase_seconds_count{phase="commit"}' in body
+    assert "cb_tick_sql_statements_bucket" in body
+    assert "cb_ticks_total" in body
+
+
+def test_request_and_db_metrics_aggregate_across_workers(
+    app_client, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(get_settings(), "metrics_dir", str(tmp_path))
+    other_worker = MetricsRegistry()
+    other_worker.counter("cb_ticks_total", "Committed ticks.").inc(1000)
+    (tmp_path / "metrics-99999.json").write_text(json.dumps(other_worker.snapshot()))
+
+    app_client.get("/v1/world/")
+    body = app_client.get("/metrics").text
+
+    assert any(
+        line.startswith("cb_http_requests_total{") and 'world/",status="200"' in line
+        for line in body.splitlines()
+    )
+    assert "cb_db_pool_checkouts_total" in body
+    ticks = next(line for line in body.splitlines() if line.startswith("cb_ticks_total "))
+    assert float(ticks.split()[1]) >= 1000
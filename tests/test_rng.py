@@ -0,0 +1,22 @@
+from app.core.rng import DeterministicRNG
+
+
+def test_keyed_stream_is_pinned_and_bulk_matches_scalar():
+    rng = DeterministicRNG("1337")
+
+    stream = rng.stream(3, "abc")
+    # Pinned output: changing these values breaks replay across versions.
+    assert [stream.next_u64() for _ in range(3)] == [
+        962429303154093171,
+        851069895375045194,
+        17777868204931515506,
+    ]
+
+    scalar = rng.stream(7, "action")
+    expected = [scalar.next_u64() for _ in range(21)]
+    bulk = rng.stream(7, "action")
+    assert list(bulk.fill_u64(5)) + list(bulk.fill_u64(16)) == expected
+
+    assert rng.stream(7, "other").next_u64() != expected[0]
+    draws = rng.stream(1, "dice").fill_random(1_000)
+    assert all(0.0 <= value < 1.0 for value in draws)
@@ -0,0 +1,19 @@
+from app.domain.rules.registry import registry
+
+
+def test_staged_ruleset_swaps_at_tick_boundary(app_client):
+    app_client.post("/v1/admin/world/reset")
+    before = registry.table()
+
+    staged = app_client.post(
+        "/v1/admin/ruleset", params={"name": "season1_dark_grid", "reload": True}
+    )
+    assert staged.status_code == 200
+    assert "buy_item" in staged.json()["actions"]
+    assert registry.table() is before
+
+    app_client.post("/v1/admin/tick/advance")
+    assert registry.table() is not before
+
+    missing = app_client.post("/v1/admin/ruleset", params={"name": "season9"})
+    assert missing.status_code == 400
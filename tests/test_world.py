@@ -1,3 +1,15 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.ticks import TickManager
+from app.core.world_cache import world_cache
+from app.domain import models
+from app.domain.services.matching_service import MatchingEngine
+from app.infra.db import lifespan_session
+
+
 def test_world_state_advances(app_client):
     app_client.post("/v1/admin/world/reset")
     res = app_client.get("/v1/world/")
@@ -9,3 +21,50 @@ def test_world_state_advances(app_client):
     assert advance.status_code == 200
     next_state = app_client.get("/v1/world/")
     assert next_state.json()["tick"] == tick + 1
+
+
+def test_world_cache_follows_tick_commits(app_client):
+    app_client.post("/v1/admin/world/reset")
+    assert world_cache.get().tick == 0
+
+    app_client.post("/v1/admin/tick/advance")
+    assert world_cache.get().tick == 1
+    assert app_client.get("/v1/world/").json()["tick"] == 1
+
+
+def test_failed_tick_rolls_back_applied_actions(app_client, create_player, monkeypatch):
+    app_client.post("/v1/admin/world/reset")
+    token = f"rollback-{uuid.uuid4()}"
+    player = create_player(f"rollback-{uuid.uuid4()}", token, balance=0)
+    action = {"type": "work", "actor_id": str(player.id), "payload": {"reward": 5}}
+    res = app_client.post(
+        "/v1/actions",
+        json={"actions": [action]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert res.status_code == 200
+    before = app_client.get("/v1/world/").json()["tick"]
+
+    async def advance():
+        async with lifespan_session() as session:
+            return await TickManager(session).advance_tick()
+
+    async def balance():
+        async with lifespan_session() as session:
+            return (await session.get(models.Player, player.id)).balance_mamp
+
+    async def broken_match(self, *, tick):
+        raise RuntimeError("matching failed")
+
+    monkeypatch.setattr(MatchingEngine, "match", broken_match)
+    with pytest.raises(RuntimeError):
+        asyncio.run(advance())
+    # The action applied before matching failed; none of its writes may survive.
+    assert asyncio.run(balance()) == 0
+    assert app_client.get("/v1/world/").json()["tick"] == before
+
+    monkeypatch.undo()
+    result = asyncio.run(advance())
+    assert result["tick"] == before + 1
+    assert len(result["applied"]) == 1
+    assert asyncio.run(balance()) == 5